@@ -1,144 +1,400 @@
 # dashboard_livres_sacres.py
+import hashlib
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-# Configuration de la page
-st.set_page_config(
-    page_title="Dashboard Comparatif - Livres Sacrés",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #2E86AB;
-        text-align: center;
-        margin-bottom: 2rem;
-        background: linear-gradient(45deg, #2E86AB, #A23B72);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-weight: bold;
-    }
-    .book-card {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid;
-        margin: 1rem 0;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    .quran-card { border-left-color: #2E86AB; }
-    .torah-card { border-left-color: #A23B72; }
-    .bible-card { border-left-color: #F18F01; }
-    .section-header {
-        color: #2E86AB;
-        border-bottom: 3px solid #2E86AB;
-        padding-bottom: 0.5rem;
-        margin: 2rem 0 1rem 0;
-        font-weight: bold;
-    }
-    .metric-box {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-        margin: 0.5rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+
+from corpus import corpus_files
+from profiling import MetricsRegistry, Profiler, profiled
+
+# CSS des pages (dashboard et site statique)
+PAGE_CSS = """
+.main-header {
+    font-size: 2.5rem;
+    color: #2E86AB;
+    text-align: center;
+    margin-bottom: 2rem;
+    background: linear-gradient(45deg, #2E86AB, #A23B72);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    font-weight: bold;
+}
+.book-card {
+    background-color: #f8f9fa;
+    padding: 1.5rem;
+    border-radius: 15px;
+    border-left: 5px solid;
+    margin: 1rem 0;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+}
+.quran-card { border-left-color: #2E86AB; }
+.torah-card { border-left-color: #A23B72; }
+.bible-card { border-left-color: #F18F01; }
+.section-header {
+    color: #2E86AB;
+    border-bottom: 3px solid #2E86AB;
+    padding-bottom: 0.5rem;
+    margin: 2rem 0 1rem 0;
+    font-weight: bold;
+}
+.metric-box {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 1rem;
+    border-radius: 10px;
+    text-align: center;
+    margin: 0.5rem;
+}
+"""
+
+
+def configure_page():
+    """Configuration de la page et CSS : appelé au début de chaque rerun, pas à l'import"""
+    # Configuration de la page
+    st.set_page_config(
+        page_title="Dashboard Comparatif - Livres Sacrés",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # CSS personnalisé
+    st.markdown(f"<style>{PAGE_CSS}</style>", unsafe_allow_html=True)
+
+
+# Nombre maximal de versets affichés par recherche
+SEARCH_RESULTS_LIMIT = 200
+# Occurrences mises en contexte par traduction (les suivantes sont seulement comptées)
+CONCORDANCE_ROWS_LIMIT = 2000
+PARALLELS_LIMIT = 200
+
+# Diffusion géographique (%) et impact culturel (1-10) de chaque livre
+DIFFUSION_DATA = {
+    'Pays': ['Monde Arabe', 'Europe', 'Amériques', 'Afrique', 'Asie'],
+    'Coran': [90, 5, 3, 40, 20],
+    'Torah': [0.1, 0.5, 2, 0.1, 0.1],
+    'Bible': [10, 70, 85, 60, 15]
+}
+IMPACT_DATA = {
+    'Domaine': ['Art', 'Musique', 'Littérature', 'Droit', 'Éducation'],
+    'Coran': [8, 7, 9, 9, 8],
+    'Torah': [7, 6, 8, 8, 7],
+    'Bible': [9, 9, 9, 8, 8]
+}
+
+# Modules importés à la demande par les sections, chargés une fois par processus par warm_process()
+WARM_MODULES = [
+    'numpy', 'pandas', 'plotly.express', 'plotly.graph_objects', 'plotly.io',
+    'charts', 'filters', 'frequencies', 'normalization', 'pipeline', 'search_index', 'timeline'
+]
+
+# Le serveur ne crée jamais de pool de processus (fork sous des threads) : les artefacts périmés
+# sont recalculés séquentiellement, pipeline.py build les prépare en parallèle avant déploiement
+SERVER_WORKERS = 1
+
+# Paramètres du cache de la couche de données
+DATA_CACHE_TTL = int(os.environ.get("SACREMENT_DATA_TTL", 3600))
+DATA_CACHE_MAX_ENTRIES = int(os.environ.get("SACREMENT_DATA_MAX_ENTRIES", 4))
+
+
+class DataLayerCache:
+    """Cache de processus pour les données, partagé en lecture seule entre les sessions"""
+
+    def __init__(self, ttl=DATA_CACHE_TTL, max_entries=DATA_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, paths):
+        """Empreinte du contenu des sources (le hachage n'est recalculé que si le fichier change)"""
+        digest = hashlib.sha256()
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                digest.update(f"{path}:absent".encode())
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            cached = self._digests.get(path)
+            if cached is None or cached[0] != signature:
+                file_digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        file_digest.update(chunk)
+                cached = (signature, file_digest.hexdigest())
+                self._digests[path] = cached
+            digest.update(f"{path}:{cached[1]}".encode())
+        return digest.hexdigest()
+
+    def get(self, paths, loader):
+        """Retourne les données associées à l'empreinte des sources, en les chargeant au besoin"""
+        with self._lock:
+            key = self.fingerprint(paths)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = loader()
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return value
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Compteurs du cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entrées': len(self._entries),
+            'ttl (s)': self.ttl,
+            'entrées max': self.max_entries
+        }
+
+
+@st.cache_resource
+def get_data_layer():
+    """Instance unique du cache de données pour le processus"""
+    return DataLayerCache()
+
+
+@st.cache_resource
+def get_view_cache():
+    """Vues filtrées par combinaison de livres, partagées par les sessions du processus"""
+    from filters import ViewCache
+    return ViewCache()
+
+
+# Ressources versionnées : seule la dernière version reste ouverte (mmap, tables LSH, tampons)
+@st.cache_resource(max_entries=1)
+def get_search_index(index_dir, version):
+    """Index plein texte ouvert une fois par processus (version : date du registre des segments)"""
+    from search_index import SearchIndex
+    return SearchIndex(index_dir)
+
+
+@st.cache_resource(max_entries=1)
+def get_parallel_index(parallels_dir, version):
+    """Signatures MinHash et tables LSH ouvertes une fois par version du registre"""
+    from parallels import ParallelIndex
+    return ParallelIndex(parallels_dir)
+
+
+@st.cache_resource(max_entries=1)
+def get_verse_store(verses_dir, books, version):
+    """Magasins des versets ouverts une fois par version du répertoire"""
+    from verse_store import VerseStore
+    return VerseStore(verses_dir, list(books))
+
+
+@st.cache_resource(max_entries=1)
+def get_verse_table(verses_dir, books, version):
+    """Table des versets et ses tris, construits une fois par version du magasin"""
+    from pipeline import load_word_counts
+    from verse_table import VerseTable
+    return VerseTable(get_verse_store(verses_dir, books, version), load_word_counts(workers=SERVER_WORKERS))
+
+
+@st.cache_resource(max_entries=1)
+def get_distributions(verses_dir, books, version):
+    """Histogrammes et courbes pré-agrégés, calculés une fois par version du magasin"""
+    from distributions import Distributions
+    from pipeline import load_word_counts
+    return Distributions(get_verse_store(verses_dir, books, version), load_word_counts(workers=SERVER_WORKERS))
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache disque des figures, partagé par les sessions du processus"""
+    from figure_cache import FigureCache
+    return FigureCache()
+
+
+@st.cache_resource(max_entries=1)
+def get_timeline_events(path, version):
+    """Événements de la frise lus une fois par version du fichier"""
+    from timeline import load_timeline_events
+    return load_timeline_events(path)
+
+
+@st.cache_resource
+def get_metrics_registry():
+    """Agrégats de profilage du processus"""
+    return MetricsRegistry()
+
+
+def _freeze(mapping):
+    """Rend un dictionnaire imbriqué non modifiable"""
+    return MappingProxyType({
+        key: _freeze(value) if isinstance(value, dict) else value
+        for key, value in mapping.items()
+    })
+
 
 class SacredBooksDashboard:
-    def __init__(self):
-        self.books_data = self.load_books_data()
-        self.comparison_data = self.load_comparison_data()
+    # Focus d'analyse -> (onglet, méthode de rendu de la section)
+    SECTIONS = {
+        "Structure": ("📊 Structure", 'create_structure_comparison'),
+        "Histoire": ("🕰️ Histoire", 'create_historical_timeline'),
+        "Influence": ("🌍 Influence", 'create_influence_analysis'),
+        "Thématiques": ("🎭 Thématiques", 'create_thematic_analysis'),
+        "Concordance": ("🔤 Concordance", 'create_concordance_section'),
+        "Recherche": ("🔎 Recherche", 'create_search_section'),
+        "Parallèles": ("🔗 Parallèles", 'create_parallels_section')
+    }
+    
+    # Icônes des thèmes clés par livre
+    BOOK_ICONS = {'Coran': '🎯', 'Torah': '📜', 'Bible': '✝️'}
+    
+    def __init__(self, data_layer=None, figure_cache=None, profiler=None, view_cache=None):
+        self.data_layer = data_layer if data_layer is not None else get_data_layer()
+        self.figure_cache = figure_cache if figure_cache is not None else get_figure_cache()
+        self.view_cache = view_cache if view_cache is not None else get_view_cache()
+        self.profiler = profiler if profiler is not None else st.session_state.setdefault('profiler', Profiler())
+        self.profiler.start_run()
+        self.data = self.data_layer.get(self.data_source_paths(), self.build_data_layer)
+        self.books_data, self.comparison_data, self.thematic_data = self.data
+
+    def filtered_view(self, books=None):
+        """Vue partagée des données pour une sélection de livres (tous par défaut)"""
+        return self.view_cache.get(self.data, self.books_data if books is None else books)
+
+    def data_source_paths(self):
+        """Fichiers dont le contenu détermine les données chargées"""
+        from book_store import BOOK_STORE_FILE
+        from frequencies import THEMES_FILE
+        return [os.path.abspath(__file__), BOOK_STORE_FILE, THEMES_FILE] + list(corpus_files().values())
+
+    def build_data_layer(self):
+        """Construit les données partagées (lecture seule) entre les sessions"""
+        from book_store import load_book_table
+        from pipeline import load_corpus_stats, load_engine, load_verse_store
+        
+        # Artefacts relus depuis data/derived (pipeline.py build les prépare avant déploiement)
+        corpus_stats = load_corpus_stats(workers=SERVER_WORKERS)
+        book_table = load_book_table()
+        engine = load_engine(workers=SERVER_WORKERS) if corpus_stats else None
+        verses = load_verse_store(workers=SERVER_WORKERS) if corpus_stats else None
+        return (_freeze(self.load_books_data(corpus_stats, book_table, verses)),
+                self.load_comparison_data(corpus_stats, book_table),
+                _freeze(self.load_thematic_data(engine)))
         
-    def load_books_data(self):
+    @profiled
+    def load_books_data(self, corpus_stats=None, book_table=None, verses=None):
         """Charge les données détaillées pour chaque livre"""
+        from book_store import BOOK_FIELDS, load_book_table
+        
+        if book_table is None:
+            book_table = load_book_table()
         books = {
-            'Coran': {
-                'nom_complet': 'Al-Quran (القرآن)',
-                'religion': 'Islam',
-                'langue_originale': 'Arabe',
-                'date_revelation': '610-632 EC',
-                'nombre_sourates': 114,
-                'nombre_versets': 6236,
-                'nombre_mots': 77439,
-                'nombre_lettres': 323015,
-                'periodicite_revelation': '23 ans',
-                'lieu_revelation': 'La Mecque et Médine',
-                'conservation': 'Mémorisation et écriture',
-                'style': 'Poétique et rythmé',
-                'theme_principal': 'Monothéisme, Législation, Éthique',
-                'division_principale': 'Sourates, Versets',
-                'premier_verset': "Lis au nom de ton Seigneur qui a créé",
-                'dernier_verset': "Et craignez le jour où vous serez ramenés vers Allah",
-                'couleur': '#2E86AB'
-            },
-            'Torah': {
-                'nom_complet': 'Torah (תּוֹרָה)',
-                'religion': 'Judaïsme',
-                'langue_originale': 'Hébreu',
-                'date_revelation': 'XIIIe siècle AEC (tradition)',
-                'nombre_sourates': 5,
-                'nombre_versets': 5845,
-                'nombre_mots': 79258,
-                'nombre_lettres': 304805,
-                'periodicite_revelation': '40 jours (Mont Sinaï)',
-                'lieu_revelation': 'Mont Sinaï',
-                'conservation': 'Rouleaux manuscrits',
-                'style': 'Narratif et législatif',
-                'theme_principal': 'Alliance, Loi, Histoire des Patriarches',
-                'division_principale': 'Livres, Parashiyot',
-                'premier_verset': "Au commencement, Dieu créa les cieux et la terre",
-                'dernier_verset': "Et il n'a plus paru en Israël de prophète comme Moïse",
-                'couleur': '#A23B72'
-            },
-            'Bible': {
-                'nom_complet': 'Bible (Βίβλος)',
-                'religion': 'Christianisme',
-                'langue_originale': 'Hébreu, Araméen, Grec',
-                'date_revelation': '1500 AEC - 100 EC',
-                'nombre_sourates': 73,
-                'nombre_versets': 35678,
-                'nombre_mots': 727969,
-                'nombre_lettres': 3100000,
-                'periodicite_revelation': '1600 ans',
-                'lieu_revelation': 'Moyen-Orient, Méditerranée',
-                'conservation': 'Manuscrits, Codex',
-                'style': 'Narratif, Poétique, Épistolaire',
-                'theme_principal': 'Salut, Amour, Rédemption',
-                'division_principale': 'Ancien/Nouveau Testament, Livres',
-                'premier_verset': "Au commencement, Dieu créa les cieux et la terre",
-                'dernier_verset': "Que la grâce du Seigneur Jésus soit avec tous",
-                'couleur': '#F18F01'
-            }
+            row['livre']: {field: row[field] for field in BOOK_FIELDS}
+            for row in book_table.to_dict('records')
         }
+        
+        # Les statistiques calculées sur les textes remplacent les valeurs saisies
+        for book_name, stats in (corpus_stats or {}).items():
+            if book_name in books:
+                books[book_name].update(stats)
+        
+        # Premier et dernier versets lus dans le magasin des versets
+        for book_name in books:
+            if verses is not None and book_name in verses:
+                books[book_name]['premier_verset'] = verses[book_name].first()
+                books[book_name]['dernier_verset'] = verses[book_name].last()
         return books
     
-    def load_comparison_data(self):
+    @profiled
+    def load_comparison_data(self, corpus_stats=None, book_table=None):
         """Charge les données pour la comparaison"""
+        from book_store import COMPARISON_COLUMNS, load_book_table
+        
+        if book_table is None:
+            book_table = load_book_table()
         # Données pour les graphiques comparatifs
-        data = {
-            'Livre': ['Coran', 'Torah', 'Bible'],
-            'Nombre de versets': [6236, 5845, 35678],
-            'Nombre de mots': [77439, 79258, 727969],
-            'Durée révélation (années)': [23, 1, 1600],
-            'Nombre de langues traduit': [150, 10, 3500],
-            'Nombre de religions': [1, 1, 3],
-            'Années depuis révélation': [1400, 3300, 2000],
-            'Pourcentage monde influencé': [24, 0.2, 33]
+        df = book_table[list(COMPARISON_COLUMNS)].rename(columns=COMPARISON_COLUMNS).reset_index(drop=True)
+        
+        for book_name, stats in (corpus_stats or {}).items():
+            mask = df['Livre'] == book_name
+            df.loc[mask, 'Nombre de versets'] = stats['nombre_versets']
+            df.loc[mask, 'Nombre de mots'] = stats['nombre_mots']
+        return df
+    
+    @profiled
+    def load_thematic_data(self, engine=None):
+        """Importance des thèmes et thèmes clés par livre, calculés sur les textes si disponibles"""
+        import pandas as pd
+        from frequencies import load_themes
+        
+        if engine is not None and engine.books:
+            return {
+                'scores': engine.theme_scores(load_themes()),
+                'themes_cles': {book: engine.top_terms(book) for book in engine.books}
+            }
+        
+        # Valeurs de référence sans corpus
+        themes_data = {
+            'Thème': ['Monothéisme', 'Prophètes', 'Loi Divine', 'Éthique', 'Histoire Sacrée', 'Salut', 'Fin des Temps'],
+            'Coran': [95, 90, 85, 80, 70, 75, 65],
+            'Torah': [90, 80, 95, 75, 90, 60, 50],
+            'Bible': [85, 85, 70, 85, 80, 95, 80]
+        }
+        return {
+            'scores': pd.DataFrame(themes_data).set_index('Thème'),
+            'themes_cles': {
+                'Coran': ['Tawhid (Unicité divine)', 'Prophétologie', 'Législation sociale',
+                          'Éthique individuelle', 'Comptes finals'],
+                'Torah': ['Alliance divine', 'Loi mosaïque', 'Histoire patriarcale',
+                          'Pureté rituelle', 'Terre promise'],
+                'Bible': ['Salvation', 'Amour divin', 'Rédemption', 'Grâce', 'Royaume de Dieu']
+            }
         }
-        return pd.DataFrame(data)
     
-    def display_header(self):
+    @profiled
+    def load_timeline_data(self):
+        """Charge les événements de la frise chronologique"""
+        import pandas as pd
+        from timeline import TIMELINE_FILE
+        
+        if os.path.exists(TIMELINE_FILE):
+            return get_timeline_events(TIMELINE_FILE, os.stat(TIMELINE_FILE).st_mtime_ns)
+        
+        timeline_data = [
+            {'Événement': 'Révélation Torah', 'Année': -1300, 'Livre': 'Torah', 'Description': 'Révélation à Moïse au Mont Sinaï'},
+            {'Événement': 'Rédaction Bible AT', 'Année': -1000, 'Livre': 'Bible', 'Description': 'Début rédaction Ancien Testament'},
+            {'Événement': 'Compilation Torah', 'Année': -500, 'Livre': 'Torah', 'Description': 'Compilation finale de la Torah'},
+            {'Événement': 'Révélation Coran', 'Année': 610, 'Livre': 'Coran', 'Description': 'Début révélation à Mahomet'},
+            {'Événement': 'Compilation Coran', 'Année': 650, 'Livre': 'Coran', 'Description': 'Compilation sous Calife Othman'},
+            {'Événement': 'Rédaction Bible NT', 'Année': 50, 'Livre': 'Bible', 'Description': 'Rédaction Nouveau Testament'},
+            {'Événement': 'Canon Bible', 'Année': 400, 'Livre': 'Bible', 'Description': 'Établissement du canon biblique'},
+            {'Événement': 'Traduction Bible', 'Année': 1382, 'Livre': 'Bible', 'Description': 'Première traduction complète'},
+            {'Événement': 'Impression Bible', 'Année': 1455, 'Livre': 'Bible', 'Description': 'Bible de Gutenberg'},
+        ]
+        
+        return pd.DataFrame(timeline_data)
+    
+    @profiled
+    def display_header(self, view=None):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">📚 Dashboard Comparatif - Livres Sacrés</h1>', 
                    unsafe_allow_html=True)
@@ -150,198 +406,257 @@ class SacredBooksDashboard:
         """, unsafe_allow_html=True)
         
         # Métriques principales
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            total_versets = self.comparison_data['Nombre de versets'].sum()
-            st.metric("Total des versets", f"{total_versets:,}")
-        
-        with col2:
-            total_mots = self.comparison_data['Nombre de mots'].sum()
-            st.metric("Total des mots", f"{total_mots:,}")
-        
-        with col3:
-            annees_revelation = self.comparison_data['Durée révélation (années)'].sum()
-            st.metric("Années de révélation", annees_revelation)
-        
-        with col4:
-            traductions = self.comparison_data['Nombre de langues traduit'].sum()
-            st.metric("Langues de traduction", f"{traductions:,}")
+        metrics = self.header_metrics(view)
+        for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+            with col:
+                st.metric(label, value)
+
+    def header_metrics(self, view=None):
+        """Métriques principales de l'en-tête : [(libellé, valeur affichée)]"""
+        comparison_data = (view or self.filtered_view()).comparison_data
+        return [
+            ("Total des versets", f"{comparison_data['Nombre de versets'].sum():,}"),
+            ("Total des mots", f"{comparison_data['Nombre de mots'].sum():,}"),
+            ("Années de révélation", comparison_data['Durée révélation (années)'].sum()),
+            ("Langues de traduction", f"{comparison_data['Nombre de langues traduit'].sum():,}")
+        ]
 
-    def create_book_cards(self):
+    @profiled
+    def create_book_cards(self, view=None):
         """Affiche les cartes détaillées pour chaque livre"""
+        view = view or self.filtered_view()
         st.markdown('<h3 class="section-header">📖 Présentation des Livres Sacrés</h3>', 
                    unsafe_allow_html=True)
         
-        col1, col2, col3 = st.columns(3)
-        
-        for idx, (book_name, book_data) in enumerate(self.books_data.items()):
-            with [col1, col2, col3][idx]:
-                st.markdown(f"""
-                <div class='book-card {book_name.lower()}-card'>
-                    <h3 style='color: {book_data["couleur"]}; margin-top: 0;'>{book_name}</h3>
-                    <p><strong>Nom complet:</strong> {book_data['nom_complet']}</p>
-                    <p><strong>Religion:</strong> {book_data['religion']}</p>
-                    <p><strong>Langue originale:</strong> {book_data['langue_originale']}</p>
-                    <p><strong>Période de révélation:</strong> {book_data['date_revelation']}</p>
-                    <p><strong>Style:</strong> {book_data['style']}</p>
-                    <p><strong>Thème principal:</strong> {book_data['theme_principal']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-    def create_structure_comparison(self):
+        cols = st.columns(3)
+        
+        for idx, (book_name, book_data) in enumerate(view.books_data.items()):
+            with cols[idx % len(cols)]:
+                st.markdown(self.book_card_html(book_name, book_data), unsafe_allow_html=True)
+
+    @staticmethod
+    def book_card_html(book_name, book_data):
+        """Carte HTML d'un livre"""
+        return f"""
+        <div class='book-card {book_name.lower()}-card'>
+            <h3 style='color: {book_data["couleur"]}; margin-top: 0;'>{book_name}</h3>
+            <p><strong>Nom complet:</strong> {book_data['nom_complet']}</p>
+            <p><strong>Religion:</strong> {book_data['religion']}</p>
+            <p><strong>Langue originale:</strong> {book_data['langue_originale']}</p>
+            <p><strong>Période de révélation:</strong> {book_data['date_revelation']}</p>
+            <p><strong>Style:</strong> {book_data['style']}</p>
+            <p><strong>Thème principal:</strong> {book_data['theme_principal']}</p>
+        </div>
+        """
+
+    @profiled
+    def create_structure_comparison(self, view=None, lazy=False):
         """Crée la comparaison structurelle"""
+        view = view or self.filtered_view()
         st.markdown('<h3 class="section-header">📊 Analyse Structurelle</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["📐 Dimensions", "📈 Visualisations", "🔍 Détails"])
+        views = {
+            "📐 Dimensions": self._render_structure_dimensions,
+            "📈 Visualisations": self._render_structure_visualisations,
+            "📉 Distributions": self._render_structure_distributions,
+            "🔍 Détails": self._render_structure_details,
+            "📜 Versets": self._render_structure_verses
+        }
         
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Graphique barres - nombre de versets
-                fig = px.bar(self.comparison_data, x='Livre', y='Nombre de versets',
-                            color='Livre', color_discrete_map={
-                                'Coran': '#2E86AB',
-                                'Torah': '#A23B72', 
-                                'Bible': '#F18F01'
-                            },
-                            title="Nombre de Versets par Livre")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Graphique barres - nombre de mots
-                fig = px.bar(self.comparison_data, x='Livre', y='Nombre de mots',
-                            color='Livre', color_discrete_map={
-                                'Coran': '#2E86AB',
-                                'Torah': '#A23B72',
-                                'Bible': '#F18F01'
-                            },
-                            title="Nombre de Mots par Livre")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Radar chart pour comparaison multi-dimensionnelle
-                dimensions = ['Nombre de versets', 'Nombre de mots', 'Durée révélation (années)', 
-                             'Nombre de langues traduit', 'Pourcentage monde influencé']
-                
-                fig = go.Figure()
-                
-                for book in self.comparison_data['Livre'].unique():
-                    book_data = self.comparison_data[self.comparison_data['Livre'] == book]
-                    values = [book_data[dim].values[0] for dim in dimensions]
-                    
-                    # Normalisation pour le radar chart
-                    max_vals = [max(self.comparison_data[dim]) for dim in dimensions]
-                    normalized_values = [v/max_v * 100 for v, max_v in zip(values, max_vals)]
-                    
-                    fig.add_trace(go.Scatterpolar(
-                        r=normalized_values,
-                        theta=dimensions,
-                        fill='toself',
-                        name=book,
-                        line=dict(color=self.books_data[book]['couleur'])
-                    ))
-                
-                fig.update_layout(
-                    polar=dict(
-                        radialaxis=dict(visible=True, range=[0, 100])
-                    ),
-                    showlegend=True,
-                    title="Profil Comparatif des Livres Sacrés",
-                    height=500
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Diagrame en bulles
-                fig = px.scatter(self.comparison_data, 
-                               x='Nombre de versets', 
-                               y='Nombre de mots',
-                               size='Durée révélation (années)',
-                               color='Livre',
-                               hover_name='Livre',
-                               size_max=60,
-                               color_discrete_map={
-                                   'Coran': '#2E86AB',
-                                   'Torah': '#A23B72',
-                                   'Bible': '#F18F01'
-                               },
-                               title="Relation Versets-Mots-Durée")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Tableau détaillé de comparaison
-            st.subheader("Tableau Comparatif Détaillé")
-            
-            comparison_details = []
-            for book_name, book_data in self.books_data.items():
-                comparison_details.append({
-                    'Livre': book_name,
-                    'Religion': book_data['religion'],
-                    'Langue originale': book_data['langue_originale'],
-                    'Période révélation': book_data['date_revelation'],
-                    'Durée révélation': book_data['periodicite_revelation'],
-                    'Nombre divisions': book_data['nombre_sourates'],
-                    'Lieu révélation': book_data['lieu_revelation'],
-                    'Méthode conservation': book_data['conservation']
-                })
-            
-            details_df = pd.DataFrame(comparison_details)
-            st.dataframe(details_df, use_container_width=True)
+        if lazy:
+            # Seule la vue sélectionnée est calculée et envoyée au navigateur
+            selected = st.radio("Vue", list(views), horizontal=True,
+                            label_visibility="collapsed", key="structure_view")
+            views[selected](view)
+            return
+        
+        for tab, render in zip(st.tabs(list(views)), views.values()):
+            with tab:
+                render(view)
+
+    def show_figure(self, builder, data, **params):
+        """Affiche un graphique, repris du cache (mémoire puis disque) s'il a déjà été construit"""
+        fig, nbytes = self.figure_cache.get_or_build_sized(builder, data, **params)
+        if self.profiler.enabled:
+            self.profiler.add_payload(nbytes)
+        st.plotly_chart(fig, use_container_width=True)
 
-    def create_historical_timeline(self):
+    def _render_structure_dimensions(self, view):
+        """Graphiques des dimensions (versets, mots)"""
+        from charts import build_bar_chart
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Graphique barres - nombre de versets
+            self.show_figure(build_bar_chart, view.comparison_data,
+                             y='Nombre de versets', title="Nombre de Versets par Livre")
+        
+        with col2:
+            # Graphique barres - nombre de mots
+            self.show_figure(build_bar_chart, view.comparison_data,
+                             y='Nombre de mots', title="Nombre de Mots par Livre")
+
+    def _render_structure_visualisations(self, view):
+        """Radar et diagramme en bulles"""
+        from charts import build_bubble_chart, build_radar_chart
+        from normalization import NORMALIZATION_METHODS
+        
+        label = st.selectbox("Normalisation", list(NORMALIZATION_METHODS), key="normalization_method")
+        method = NORMALIZATION_METHODS[label]
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Radar chart pour comparaison multi-dimensionnelle
+            self.show_figure(build_radar_chart, view.normalized(method),
+                             colors=view.colors, method=method)
+        
+        with col2:
+            # Diagrame en bulles : taille proportionnelle à la durée (part du maximum)
+            sizes = view.normalized('max')['Durée révélation (années)'].to_numpy()
+            self.show_figure(build_bubble_chart, view.comparison_data.assign(Taille=sizes), colors=view.colors)
+
+    def load_distributions(self):
+        """Distributions pré-agrégées du corpus (None sans corpus)"""
+        if self.load_verse_store() is None:
+            return None
+        from pipeline import DERIVED_DIR
+        
+        directory = os.path.join(DERIVED_DIR, 'versets')
+        return get_distributions(directory, tuple(corpus_files()), os.stat(directory).st_mtime_ns)
+
+    def _render_structure_distributions(self, view):
+        """Histogramme des longueurs, mots par chapitre et longueur cumulée (agrégats seulement)"""
+        from charts import build_chapter_words_chart, build_cumulative_chart, build_length_histogram
+        
+        distributions = self.load_distributions()
+        if distributions is None:
+            st.info("Aucun corpus disponible : ajoutez des fichiers de versets dans `data/corpus` pour afficher les distributions.")
+            return
+        books = [book for book in distributions.books if book in view.books_data]
+        if not books:
+            st.info("Aucun texte pour les livres sélectionnés.")
+            return
+        
+        # Zoom : la plage choisie est regroupée en classes plus fines
+        low, high = distributions.word_range(books)
+        zoom = (low, high)
+        if low < high:
+            zoom = st.slider("Mots par verset", low, high, zoom, key="distribution_range")
+        self.show_figure(build_length_histogram, distributions.histogram(books, *zoom), colors=view.colors)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            self.show_figure(build_chapter_words_chart, distributions.chapters(books), colors=view.colors)
+        with col2:
+            self.show_figure(build_cumulative_chart, distributions.cumulative(books), colors=view.colors)
+
+    def _render_structure_details(self, view):
+        """Tableau comparatif détaillé"""
+        # Tableau détaillé de comparaison
+        st.subheader("Tableau Comparatif Détaillé")
+        st.dataframe(self.structure_details(view), use_container_width=True)
+
+    def structure_details(self, view):
+        """Caractéristiques de chaque livre de la vue, une ligne par livre"""
+        import pandas as pd
+        
+        comparison_details = []
+        for book_name, book_data in view.books_data.items():
+            comparison_details.append({
+                'Livre': book_name,
+                'Religion': book_data['religion'],
+                'Langue originale': book_data['langue_originale'],
+                'Période révélation': book_data['date_revelation'],
+                'Durée révélation': book_data['periodicite_revelation'],
+                'Nombre divisions': book_data['nombre_sourates'],
+                'Lieu révélation': book_data['lieu_revelation'],
+                'Méthode conservation': book_data['conservation']
+            })
+        
+        return pd.DataFrame(comparison_details)
+
+    def load_verse_table(self):
+        """Table des versets du corpus (None sans corpus)"""
+        if self.load_verse_store() is None:
+            return None
+        from pipeline import DERIVED_DIR
+        
+        directory = os.path.join(DERIVED_DIR, 'versets')
+        return get_verse_table(directory, tuple(corpus_files()), os.stat(directory).st_mtime_ns)
+
+    def _render_structure_verses(self, view):
+        """Table des versets paginée côté serveur : seule la page affichée est envoyée"""
+        from verse_table import PAGE_SIZES, SORT_KEYS
+        
+        table = self.load_verse_table()
+        if table is None:
+            st.info("Aucun corpus disponible : ajoutez des fichiers de versets dans `data/corpus` pour afficher les versets.")
+            return
+        
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            sort = st.selectbox("Tri", list(SORT_KEYS), key="verses_sort")
+        with col2:
+            descending = st.toggle("Décroissant", key="verses_descending")
+        with col3:
+            page_size = st.selectbox("Lignes", PAGE_SIZES, index=1, key="verses_page_size")
+        word_range = (None, None)
+        if table.words is not None and len(table):
+            low, high = int(table.words.min()), int(table.words.max())
+            if low < high:
+                word_range = st.slider("Mots par verset", low, high, (low, high), key="verses_words")
+        
+        start = time.perf_counter()
+        books = [book for book in table.books if book in view.books_data]
+        rows = table.select(SORT_KEYS[sort], descending, books, *word_range)
+        pages = max(1, -(-len(rows) // page_size))
+        with col4:
+            number = min(int(st.number_input("Page", min_value=1, value=1, step=1, key="verses_page")), pages)
+        page = table.page(rows, number, page_size)
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        if page.empty:
+            st.info("Aucun verset ne correspond aux filtres.")
+            return
+        st.dataframe(page, use_container_width=True, hide_index=True)
+        first = (number - 1) * page_size + 1
+        st.caption(f"Versets {first:,}–{first + len(page) - 1:,} sur {len(rows):,} "
+                   f"(page {number}/{pages}, {elapsed:.1f} ms)")
+
+    @profiled
+    def create_historical_timeline(self, view=None):
         """Crée la frise chronologique historique"""
+        from timeline import build_timeline_chart
+        
+        view = view or self.filtered_view()
         st.markdown('<h3 class="section-header">🕰️ Frise Chronologique</h3>', 
                    unsafe_allow_html=True)
         
-        # Données pour la frise chronologique
-        timeline_data = [
-            {'Événement': 'Révélation Torah', 'Année': -1300, 'Livre': 'Torah', 'Description': 'Révélation à Moïse au Mont Sinaï'},
-            {'Événement': 'Rédaction Bible AT', 'Année': -1000, 'Livre': 'Bible', 'Description': 'Début rédaction Ancien Testament'},
-            {'Événement': 'Compilation Torah', 'Année': -500, 'Livre': 'Torah', 'Description': 'Compilation finale de la Torah'},
-            {'Événement': 'Révélation Coran', 'Année': 610, 'Livre': 'Coran', 'Description': 'Début révélation à Mahomet'},
-            {'Événement': 'Compilation Coran', 'Année': 650, 'Livre': 'Coran', 'Description': 'Compilation sous Calife Othman'},
-            {'Événement': 'Rédaction Bible NT', 'Année': 50, 'Livre': 'Bible', 'Description': 'Rédaction Nouveau Testament'},
-            {'Événement': 'Canon Bible', 'Année': 400, 'Livre': 'Bible', 'Description': 'Établissement du canon biblique'},
-            {'Événement': 'Traduction Bible', 'Année': 1382, 'Livre': 'Bible', 'Description': 'Première traduction complète'},
-            {'Événement': 'Impression Bible', 'Année': 1455, 'Livre': 'Bible', 'Description': 'Bible de Gutenberg'},
-        ]
+        timeline_df = view.timeline(self.load_timeline_data())
+        if timeline_df.empty:
+            st.info("Aucun événement pour les livres sélectionnés.")
+            return
         
-        timeline_df = pd.DataFrame(timeline_data)
+        # Période affichée : le niveau de détail est recalculé pour la fenêtre choisie
+        first_year, last_year = int(timeline_df['Année'].min()), int(timeline_df['Année'].max())
+        year_range = (first_year, last_year)
+        if first_year < last_year:
+            year_range = st.slider("Période", min_value=first_year, max_value=last_year,
+                                   value=year_range, key="timeline_range")
         
         # Création de la frise chronologique
-        fig = px.scatter(timeline_df, x='Année', y='Livre', color='Livre',
-                        size=[10]*len(timeline_df),  # Taille constante des points
-                        hover_data=['Description'],
-                        color_discrete_map={
-                            'Coran': '#2E86AB',
-                            'Torah': '#A23B72',
-                            'Bible': '#F18F01'
-                        },
-                        title="Frise Chronologique des Livres Sacrés")
-        
-        # Ajout des lignes de connexion
-        for _, row in timeline_df.iterrows():
-            fig.add_annotation(
-                x=row['Année'],
-                y=row['Livre'],
-                text=row['Événement'],
-                showarrow=True,
-                arrowhead=1,
-                ax=0,
-                ay=-40
-            )
-        
-        fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        self.show_figure(build_timeline_chart, timeline_df,
+                         colors=view.colors, year_range=tuple(year_range))
 
-    def create_influence_analysis(self):
+    @profiled
+    def create_influence_analysis(self, view=None):
         """Analyse de l'influence mondiale"""
+        import pandas as pd
+        from charts import build_diffusion_chart, build_impact_chart
+        
+        view = view or self.filtered_view()
         st.markdown('<h3 class="section-header">🌍 Influence et Diffusion</h3>', 
                    unsafe_allow_html=True)
         
@@ -349,106 +664,225 @@ class SacredBooksDashboard:
         
         with col1:
             # Carte de diffusion mondiale
-            diffusion_data = {
-                'Pays': ['Monde Arabe', 'Europe', 'Amériques', 'Afrique', 'Asie'],
-                'Coran': [90, 5, 3, 40, 20],
-                'Torah': [0.1, 0.5, 2, 0.1, 0.1],
-                'Bible': [10, 70, 85, 60, 15]
-            }
-            diffusion_df = pd.DataFrame(diffusion_data)
-            
-            fig = go.Figure()
-            
-            fig.add_trace(go.Bar(name='Coran', x=diffusion_df['Pays'], y=diffusion_df['Coran'],
-                                marker_color='#2E86AB'))
-            fig.add_trace(go.Bar(name='Torah', x=diffusion_df['Pays'], y=diffusion_df['Torah'],
-                                marker_color='#A23B72'))
-            fig.add_trace(go.Bar(name='Bible', x=diffusion_df['Pays'], y=diffusion_df['Bible'],
-                                marker_color='#F18F01'))
+            diffusion_df = view.book_columns(pd.DataFrame(DIFFUSION_DATA), 'Pays')
             
-            fig.update_layout(
-                title="Diffusion Géographique (%)",
-                barmode='group',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(build_diffusion_chart, diffusion_df)
         
         with col2:
             # Impact culturel
-            impact_data = {
-                'Domaine': ['Art', 'Musique', 'Littérature', 'Droit', 'Éducation'],
-                'Coran': [8, 7, 9, 9, 8],
-                'Torah': [7, 6, 8, 8, 7],
-                'Bible': [9, 9, 9, 8, 8]
-            }
-            impact_df = pd.DataFrame(impact_data)
-            
-            fig = px.line(impact_df, x='Domaine', y=['Coran', 'Torah', 'Bible'],
-                         title="Impact Culturel par Domaine (1-10)",
-                         color_discrete_map={
-                             'Coran': '#2E86AB',
-                             'Torah': '#A23B72',
-                             'Bible': '#F18F01'
-                         })
+            impact_df = view.book_columns(pd.DataFrame(IMPACT_DATA), 'Domaine')
             
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            self.show_figure(build_impact_chart, impact_df)
 
-    def create_thematic_analysis(self):
+    @profiled
+    def create_thematic_analysis(self, view=None):
         """Analyse thématique comparative"""
+        from charts import build_theme_heatmap
+        
+        view = view or self.filtered_view()
         st.markdown('<h3 class="section-header">🎭 Analyse Thématique</h3>', 
                    unsafe_allow_html=True)
         
-        # Données des thèmes principaux
-        themes_data = {
-            'Thème': ['Monothéisme', 'Prophètes', 'Loi Divine', 'Éthique', 'Histoire Sacrée', 'Salut', 'Fin des Temps'],
-            'Coran': [95, 90, 85, 80, 70, 75, 65],
-            'Torah': [90, 80, 95, 75, 90, 60, 50],
-            'Bible': [85, 85, 70, 85, 80, 95, 80]
-        }
-        themes_df = pd.DataFrame(themes_data)
-        
         # Heatmap des thèmes
-        fig = px.imshow(themes_df.set_index('Thème'),
-                       title="Importance Relative des Thèmes (%)",
-                       color_continuous_scale='Viridis',
-                       aspect="auto")
-        
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        self.show_figure(build_theme_heatmap, view.thematic_data['scores'])
         
         # Analyse détaillée par livre
-        col1, col2, col3 = st.columns(3)
+        key_themes = view.thematic_data['themes_cles']
+        for col, (book_name, themes) in zip(st.columns(len(key_themes)), key_themes.items()):
+            with col:
+                st.subheader(f"{self.BOOK_ICONS.get(book_name, '📖')} {book_name} - Thèmes Clés")
+                st.markdown("\n".join(f"- **{theme}**" for theme in themes))
+
+    @profiled
+    def create_concordance_section(self, view=None):
+        """Concordance : chaque occurrence d'un mot en contexte, diffusée au fil de la lecture de l'index"""
+        import pandas as pd
         
-        with col1:
-            st.subheader("🎯 Coran - Thèmes Clés")
-            st.markdown("""
-            - **Tawhid** (Unicité divine)
-            - **Prophétologie**
-            - **Législation sociale**
-            - **Éthique individuelle**
-            - **Comptes finals**
-            """)
+        view = view or self.filtered_view()
+        st.markdown('<h3 class="section-header">🔤 Concordance</h3>', 
+                   unsafe_allow_html=True)
         
+        index = self.load_search_index()
+        if index is None:
+            st.info("Aucun corpus disponible : ajoutez des fichiers de versets dans `data/corpus` pour activer la concordance.")
+            return
+        
+        query = st.text_input("Mot ou expression", placeholder="alliance", key="concordance_query")
+        books = [book for book in index.books if book in view.books_data]
+        if not query or not books:
+            return
+        
+        # Compteurs par livre, remplacés à chaque lot ; chaque lot reçu est ajouté comme un nouveau
+        # tableau (seules ses lignes sont envoyées), remplacé à la fin par le tableau complet
+        status = st.empty()
+        counters = {book: col.empty() for book, col in zip(books, st.columns(len(books)))}
+        tables, batches = {}, {}
+        for book in books:
+            with st.expander(f"{self.BOOK_ICONS.get(book, '📖')} {book}", expanded=True):
+                tables[book] = st.empty()
+                batches[book] = tables[book].container()
+        counts = {book: 0 for book in books}
+        rows = {book: [] for book in books}
+        for book in books:
+            counters[book].metric(book, 0)
+        
+        start = time.perf_counter()
+        for book, count, batch in index.concordance(query, books, limit=CONCORDANCE_ROWS_LIMIT):
+            counts[book] += count
+            counters[book].metric(book, f"{counts[book]:,}")
+            if batch:
+                rows[book].extend(batch)
+                batches[book].dataframe(pd.DataFrame(batch), use_container_width=True, hide_index=True)
+            status.caption(f"{sum(counts.values()):,} occurrence(s)…")
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        for book in books:
+            if rows[book]:
+                tables[book].dataframe(pd.DataFrame(rows[book]), use_container_width=True, hide_index=True)
+            else:
+                tables[book].write("Aucune occurrence")
+        truncated = any(counts[book] > len(rows[book]) for book in books)
+        status.caption(f"{sum(counts.values()):,} occurrence(s) en {elapsed:.0f} ms"
+                       + (f" — les {CONCORDANCE_ROWS_LIMIT:,} premières par traduction sont affichées" if truncated else ""))
+
+    def refresh_artifacts(self, kind, message):
+        """Reconstruit les artefacts `kind` périmés (corpus modifié) avant de les ouvrir"""
+        from pipeline import is_stale, update
+        
+        if is_stale([kind]):
+            with st.spinner(message):
+                update(kinds=[kind], workers=SERVER_WORKERS)
+
+    def load_search_index(self):
+        """Ouvre l'index plein texte, reconstruit d'abord s'il est absent ou périmé"""
+        from search_index import INDEX_DIR, SEGMENTS_FILE
+        
+        registry = os.path.join(INDEX_DIR, SEGMENTS_FILE)
+        if corpus_files():
+            self.refresh_artifacts('index', "Indexation du corpus...")
+        if not os.path.exists(registry):
+            return None
+        return get_search_index(INDEX_DIR, os.stat(registry).st_mtime_ns)
+
+    @profiled
+    def create_search_section(self, view=None):
+        """Recherche plein texte dans les versets"""
+        import pandas as pd
+        
+        view = view or self.filtered_view()
+        st.markdown('<h3 class="section-header">🔎 Recherche dans les Textes</h3>', 
+                   unsafe_allow_html=True)
+        
+        index = self.load_search_index()
+        if index is None:
+            st.info("Aucun corpus disponible : ajoutez des fichiers de versets dans `data/corpus` pour activer la recherche.")
+            return
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            query = st.text_input("Mots ou \"expression exacte\"",
+                                  placeholder='alliance "au commencement"')
         with col2:
-            st.subheader("📜 Torah - Thèmes Clés")
-            st.markdown("""
-            - **Alliance divine**
-            - **Loi mosaïque**
-            - **Histoire patriarcale**
-            - **Pureté rituelle**
-            - **Terre promise**
-            """)
+            selected = [book for book in index.books if book in view.books_data]
+            books = st.multiselect("Livres", index.books, default=selected or index.books)
         
-        with col3:
-            st.subheader("✝️ Bible - Thèmes Clés")
-            st.markdown("""
-            - **Salvation**
-            - **Amour divin**
-            - **Rédemption**
-            - **Grâce**
-            - **Royaume de Dieu**
-            """)
+        if query and not books:
+            st.info("Sélectionnez au moins un livre pour lancer la recherche.")
+        elif query:
+            start = time.perf_counter()
+            total, hits = index.search(query, books, limit=SEARCH_RESULTS_LIMIT)
+            elapsed = (time.perf_counter() - start) * 1000
+            
+            st.caption(f"{total:,} verset(s) trouvé(s) en {elapsed:.1f} ms")
+            if hits:
+                st.dataframe(pd.DataFrame(hits), use_container_width=True, hide_index=True)
+        
+        self._render_verse_reader(view)
+
+    def load_verse_store(self):
+        """Ouvre le magasin des versets, reconstruit d'abord s'il est absent ou périmé"""
+        from pipeline import DERIVED_DIR
+        
+        books = list(corpus_files())
+        if not books:
+            return None
+        directory = os.path.join(DERIVED_DIR, 'versets')
+        self.refresh_artifacts('versets', "Construction du magasin des versets...")
+        return get_verse_store(directory, tuple(books), os.stat(directory).st_mtime_ns)
+
+    def _render_verse_reader(self, view):
+        """Lecture d'un chapitre, servie par le magasin des versets"""
+        store = self.load_verse_store()
+        if store is None:
+            return
+        
+        with st.expander("📖 Lecture d'un chapitre"):
+            books = [book for book in store.books if book in view.books_data] or list(store.books)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                book = st.selectbox("Livre", books, key="reader_book")
+            verses = store[book]
+            with col2:
+                livre = st.selectbox("Division", verses.divisions, key="reader_division")
+            with col3:
+                chapitre = st.selectbox("Chapitre", verses.chapters(livre), key="reader_chapter")
+            if chapitre is not None:
+                st.markdown("\n\n".join(f"**{verse}** {text}" for verse, text in verses.chapter(livre, chapitre)))
+
+    def load_parallel_index(self):
+        """Ouvre les passages parallèles, recalculés d'abord s'ils sont absents ou périmés"""
+        from parallels import PARALLELS_DIR, REGISTRY_FILE
+        
+        registry = os.path.join(PARALLELS_DIR, REGISTRY_FILE)
+        if corpus_files():
+            self.refresh_artifacts('minhash', "Calcul des signatures des versets...")
+        if not os.path.exists(registry):
+            return None
+        return get_parallel_index(PARALLELS_DIR, os.stat(registry).st_mtime_ns)
+
+    @profiled
+    def create_parallels_section(self, view=None):
+        """Passages parallèles entre livres (MinHash / LSH)"""
+        import pandas as pd
+        from parallels import MIN_SIMILARITY
+        
+        view = view or self.filtered_view()
+        st.markdown('<h3 class="section-header">🔗 Passages Parallèles</h3>', 
+                   unsafe_allow_html=True)
+        
+        index = self.load_parallel_index()
+        if index is None:
+            st.info("Aucun corpus disponible : ajoutez des fichiers de versets dans `data/corpus` pour détecter les passages parallèles.")
+            return
+        
+        books = [book for book in index.books if book in view.books_data] or index.books
+        threshold = st.slider("Similarité minimale", min_value=MIN_SIMILARITY, max_value=1.0,
+                              value=MIN_SIMILARITY, step=0.05, key="parallels_threshold")
+        
+        # Nombre de paires par couple de livres
+        counts = index.counts(books)
+        if counts:
+            for col, ((book_a, book_b), count) in zip(st.columns(len(counts)), counts.items()):
+                with col:
+                    st.metric(f"{book_a} ↔ {book_b}", f"{count:,}")
+        
+        start = time.perf_counter()
+        total, pairs = index.parallel_pairs(books, threshold, limit=PARALLELS_LIMIT)
+        elapsed = (time.perf_counter() - start) * 1000
+        st.caption(f"{total:,} paire(s) de versets parallèles en {elapsed:.1f} ms")
+        if pairs:
+            st.dataframe(pd.DataFrame(pairs), use_container_width=True, hide_index=True)
+        
+        # Versets proches d'un passage saisi
+        passage = st.text_input("Passage à rapprocher", key="parallels_passage",
+                                placeholder="Au commencement, Dieu créa les cieux et la terre")
+        if passage:
+            start = time.perf_counter()
+            similar = index.similar(passage, books, threshold)
+            elapsed = (time.perf_counter() - start) * 1000
+            st.caption(f"{len(similar)} verset(s) proche(s) en {elapsed:.1f} ms")
+            if similar:
+                st.dataframe(pd.DataFrame(similar), use_container_width=True, hide_index=True)
 
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
@@ -457,61 +891,112 @@ class SacredBooksDashboard:
         # Sélecteur de focus
         analysis_focus = st.sidebar.selectbox(
             "Focus d'analyse",
-            ["Vue d'ensemble", "Structure", "Histoire", "Influence", "Thématiques"]
+            ["Vue d'ensemble"] + list(self.SECTIONS)
+        )
+        
+        # Rendu paresseux : seule la section du focus est calculée
+        lazy_rendering = st.sidebar.toggle(
+            "Rendu paresseux", value=True,
+            help="Ne calcule et n'envoie que les graphiques de la section sélectionnée"
         )
         
-        # Filtre des livres
+        # Filtre des livres : une vue filtrée partagée par toutes les sections
         st.sidebar.markdown("### 📚 Livres à Afficher")
-        show_quran = st.sidebar.checkbox("Coran", True)
-        show_torah = st.sidebar.checkbox("Torah", True)
-        show_bible = st.sidebar.checkbox("Bible", True)
+        books = list(self.books_data)
+        selected_books = st.sidebar.multiselect("Livres", books, default=books,
+                                                label_visibility="collapsed", key="selected_books")
+        view = self.filtered_view(selected_books)
         
         # Métriques rapides
         st.sidebar.markdown("### 📊 Statistiques Globales")
-        total_books = sum([show_quran, show_torah, show_bible])
-        total_verses = sum([self.books_data[book]['nombre_versets'] for book in ['Coran', 'Torah', 'Bible'] 
-                          if (book == 'Coran' and show_quran) or (book == 'Torah' and show_torah) or (book == 'Bible' and show_bible)])
+        st.sidebar.metric("Livres affichés", len(view.books))
+        st.sidebar.metric("Versets totaux", f"{view.total_verses:,}")
         
-        st.sidebar.metric("Livres affichés", total_books)
-        st.sidebar.metric("Versets totaux", f"{total_verses:,}")
+        # Statistiques du cache de données
+        with st.sidebar.expander("🗄️ Cache des données"):
+            for name, value in self.data_layer.stats().items():
+                st.write(f"**{name}** : {value}")
+            st.markdown("**Figures**")
+            for name, value in self.figure_cache.stats().items():
+                st.write(f"**{name}** : {value}")
+        
+        # Profilage des sections (désactivé : aucun surcoût)
+        profiling = st.sidebar.toggle("⏱️ Performance", value=self.profiler.enabled,
+                                      help="Mesure le temps, la taille des figures et la mémoire par section")
         
         return {
             'analysis_focus': analysis_focus,
-            'show_quran': show_quran,
-            'show_torah': show_torah,
-            'show_bible': show_bible
+            'lazy_rendering': lazy_rendering,
+            'profiling': profiling,
+            'view': view
         }
 
+    def create_performance_panel(self):
+        """Bloc Performance de la sidebar : mesures du rerun et exports"""
+        import pandas as pd
+        
+        records = self.profiler.records
+        registry = get_metrics_registry()
+        registry.record_run(records)
+        registry.export(records)
+        
+        with st.sidebar.expander("⏱️ Performance", expanded=True):
+            if not records:
+                st.write("Aucune mesure pour ce rerun")
+                return
+            perf_df = pd.DataFrame([{
+                'Section': record['section'],
+                'Temps (ms)': round(record['secondes'] * 1000, 1),
+                'Figures (Ko)': round(record['octets_figures'] / 1024, 1),
+                'Mémoire (Ko)': round(record['memoire_delta'] / 1024, 1)
+            } for record in records])
+            st.dataframe(perf_df, use_container_width=True, hide_index=True)
+            st.download_button("Exporter (Prometheus)", registry.to_prometheus(),
+                               file_name="sacrement_metrics.prom", mime="text/plain")
+            st.download_button("Exporter (JSON lines)",
+                               json.dumps({'sections': records}, ensure_ascii=False) + "\n",
+                               file_name="sacrement_metrics.jsonl", mime="application/json")
+
+    def render_focused_section(self, focus, view):
+        """Rend uniquement la section correspondant au focus d'analyse"""
+        if focus == "Vue d'ensemble":
+            self.create_book_cards(view)
+            return
+        
+        _, method = self.SECTIONS[focus]
+        if method == 'create_structure_comparison':
+            # Les sous-onglets de la structure sont eux aussi rendus à la demande
+            self.create_structure_comparison(view, lazy=True)
+        else:
+            getattr(self, method)(view)
+
     def run_dashboard(self):
         """Exécute le dashboard complet"""
         # Sidebar
         controls = self.create_sidebar()
+        self.profiler.set_enabled(controls['profiling'])
         
-        # Header
-        self.display_header()
-        
-        # Cartes des livres
-        self.create_book_cards()
+        view = controls['view']
         
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "📊 Structure", 
-            "🕰️ Histoire", 
-            "🌍 Influence", 
-            "🎭 Thématiques"
-        ])
-        
-        with tab1:
-            self.create_structure_comparison()
-        
-        with tab2:
-            self.create_historical_timeline()
+        # Header
+        self.display_header(view)
         
-        with tab3:
-            self.create_influence_analysis()
+        if not view.books:
+            st.info("Sélectionnez au moins un livre dans la barre latérale.")
+        elif controls['lazy_rendering']:
+            self.render_focused_section(controls['analysis_focus'], view)
+        else:
+            # Cartes des livres
+            self.create_book_cards(view)
+            
+            # Navigation par onglets
+            sections = list(self.SECTIONS.values())
+            for tab, (_, method) in zip(st.tabs([label for label, _ in sections]), sections):
+                with tab:
+                    getattr(self, method)(view)
         
-        with tab4:
-            self.create_thematic_analysis()
+        if self.profiler.enabled:
+            self.create_performance_panel()
         
         # Footer
         st.markdown("---")
@@ -522,7 +1007,70 @@ class SacredBooksDashboard:
         *Données à but éducatif et informatif*
         """)
 
-# Lancement du dashboard
-if __name__ == "__main__":
+
+def prewarm(render_figures=True):
+    """Prépare les données sur disque avant le déploiement ; retourne la durée de chaque étape (s)
+
+    Lancé dans un processus séparé (`python Sacrement.py --prewarm`) : met à jour les artefacts
+    dérivés du corpus, vérifie que la couche de données se construit et, si `render_figures`,
+    rend chaque section une fois pour remplir le cache disque des figures relu par le serveur.
+    """
+    timings = {}
+    start = time.perf_counter()
+    if corpus_files():
+        from pipeline import update
+        update()
+    timings['artefacts'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dashboard = SacredBooksDashboard(profiler=Profiler(enabled=False))
+    timings['donnees'] = time.perf_counter() - start
+
+    if render_figures:
+        start = time.perf_counter()
+        view = dashboard.filtered_view()
+        dashboard.create_book_cards(view)
+        for _, method in dashboard.SECTIONS.values():
+            getattr(dashboard, method)(view)
+        timings['figures'] = time.perf_counter() - start
+    return timings
+
+
+@st.cache_resource(show_spinner="Préparation du serveur...")
+def warm_process():
+    """Préchauffe le processus serveur, une seule fois : modules des sections et couche de données
+
+    Les sessions suivantes ne paient ni l'import de pandas, NumPy et Plotly ni la construction
+    des données ; les artefacts à jour sont seulement relus. Retourne la durée de chaque étape (s).
+    """
+    timings = {}
+    start = time.perf_counter()
+    for name in WARM_MODULES:
+        importlib.import_module(name)
+    timings['modules'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    SacredBooksDashboard(profiler=Profiler(enabled=False))
+    timings['donnees'] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    """Point d'entrée de `streamlit run Sacrement.py`"""
+    configure_page()
+    warm_process()
     dashboard = SacredBooksDashboard()
-    dashboard.run_dashboard()
\ No newline at end of file
+    dashboard.run_dashboard()
+
+
+# Lancement du dashboard (python Sacrement.py --prewarm : artefacts et cache des figures avant déploiement)
+if __name__ == "__main__":
+    if '--prewarm' in sys.argv[1:]:
+        # Hors `streamlit run`, chaque appel st.* signale l'absence de contexte d'exécution
+        from streamlit.logger import set_log_level
+        st.config.set_option('logger.level', 'error')
+        set_log_level('error')
+        for step, seconds in prewarm().items():
+            print(f"{step:<10} {seconds * 1000:8.1f} ms")
+    else:
+        main()
\ No newline at end of file
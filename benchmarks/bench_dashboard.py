@@ -0,0 +1,334 @@
+# bench_dashboard.py
+"""Mesure de la latence de rendu du dashboard, section par section, sans navigateur
+
+    python benchmarks/bench_dashboard.py                    # compare à baseline.json
+    python benchmarks/bench_dashboard.py --update-baseline  # enregistre les mesures comme référence
+
+Le dashboard tourne dans un répertoire temporaire (corpus synthétique, artefacts, cache des
+figures) : les données locales de `data/` ne faussent jamais les mesures.
+"""
+import argparse
+import atexit
+import functools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Environnement isolé, fixé avant l'import du dashboard (les répertoires sont lus à l'import)
+WORK_DIR = tempfile.mkdtemp(prefix="sacrement-bench-")
+atexit.register(shutil.rmtree, WORK_DIR, True)
+for variable, name in [('SACREMENT_CORPUS_DIR', 'corpus'), ('SACREMENT_DERIVED_DIR', 'derived'),
+                       ('SACREMENT_INDEX_DIR', 'index'), ('SACREMENT_PARALLELS_DIR', 'parallels'),
+                       ('SACREMENT_FIGURE_CACHE_DIR', 'figures'), ('SACREMENT_BOOK_STORE', 'livres.arrow'),
+                       ('SACREMENT_THEMES_FILE', 'themes.json'), ('SACREMENT_TIMELINE_FILE', 'timeline.csv')]:
+    os.environ[variable] = os.path.join(WORK_DIR, name)
+os.environ['SACREMENT_STATS_WORKERS'] = '1'
+os.environ.pop('SACREMENT_PROFILING', None)
+
+sys.path.insert(0, ROOT)
+from stub_streamlit import install  # noqa: E402
+
+st = install()
+
+import pandas as pd  # noqa: E402
+
+import Sacrement  # noqa: E402
+
+# Sections chronométrées à chaque rerun
+SECTIONS = [
+    'create_sidebar',
+    'display_header',
+    'create_book_cards',
+    'create_structure_comparison',
+    'create_historical_timeline',
+    'create_influence_analysis',
+    'create_thematic_analysis'
+]
+
+# Sections adossées au corpus, avec les saisies de chaque rerun (clé ou libellé du widget)
+CORPUS_SECTIONS = [
+    'create_search_section',
+    'create_concordance_section',
+    'create_parallels_section'
+]
+
+# Récits repris dans plusieurs livres du corpus synthétique (passages parallèles)
+NARRATIVES = [
+    "Au commencement, Dieu créa les cieux et la terre",
+    "Abraham reçut la promesse d'une descendance aussi nombreuse que les étoiles du ciel",
+    "Moïse conduisit le peuple hors d'Égypte à travers la mer",
+    "Joseph fut vendu par ses frères et devint gouverneur de l'Égypte",
+    "Dieu conclut une alliance avec Noé après le déluge"
+]
+
+CORPUS_INPUTS = {
+    'Mots ou "expression exacte"': 'alliance "au commencement"',
+    'concordance_query': 'alliance',
+    'parallels_passage': NARRATIVES[0]
+}
+
+VERSES_PER_CHAPTER = 40
+
+
+class StaticDataLayer:
+    """Couche de données figée (données synthétiques), sans cache"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, paths, loader):
+        return self.data
+
+    def stats(self):
+        return {}
+
+
+class NoFigureCache:
+    """Construit toujours les figures : on mesure leur construction, pas le cache"""
+
+    def get_or_build(self, builder, data, **params):
+        return builder(data, **params)
+
+    def get_or_build_sized(self, builder, data, **params):
+        return builder(data, **params), 0
+
+    def stats(self):
+        return {}
+
+
+def synthetic_data(n_books, seed=0):
+    """books_data, comparison_data et thematic_data pour `n_books` livres"""
+    rng = random.Random(seed)
+    dashboard = Sacrement.SacredBooksDashboard(StaticDataLayer((None, None, None)), NoFigureCache())
+    reference = dashboard.load_books_data()
+    template = next(iter(reference.values()))
+
+    names = list(reference)[:n_books] + [f"Livre {i:04d}" for i in range(len(reference), n_books)]
+    books = {}
+    rows = []
+    for name in names:
+        book = dict(reference.get(name, template))
+        if name not in reference:
+            book['couleur'] = f"#{rng.randrange(0x1000000):06X}"
+            book['nombre_versets'] = rng.randint(1000, 40000)
+            book['nombre_mots'] = book['nombre_versets'] * rng.randint(10, 25)
+        books[name] = book
+        rows.append({
+            'Livre': name,
+            'Nombre de versets': book['nombre_versets'],
+            'Nombre de mots': book['nombre_mots'],
+            'Durée révélation (années)': rng.randint(1, 1600),
+            'Nombre de langues traduit': rng.randint(1, 3500),
+            'Nombre de religions': rng.randint(1, 3),
+            'Années depuis révélation': rng.randint(100, 3500),
+            'Pourcentage monde influencé': round(rng.uniform(0, 35), 1)
+        })
+
+    themes = ['Monothéisme', 'Prophètes', 'Loi Divine', 'Éthique', 'Histoire Sacrée', 'Salut', 'Fin des Temps']
+    scores = pd.DataFrame({name: [rng.randint(0, 100) for _ in themes] for name in names},
+                          index=pd.Index(themes, name='Thème'))
+    thematic = {'scores': scores, 'themes_cles': {name: themes[:5] for name in names}}
+    return books, pd.DataFrame(rows), thematic
+
+
+def synthetic_timeline(n_events, books, seed=0):
+    """`n_events` événements répartis sur les livres"""
+    rng = random.Random(seed)
+    return pd.DataFrame([{
+        'Événement': f"Événement {i}",
+        'Année': rng.randint(-1500, 2000),
+        'Livre': rng.choice(books),
+        'Description': f"Description de l'événement {i}"
+    } for i in range(n_events)])
+
+
+def synthetic_corpus(corpus_dir, books, n_verses, seed=0):
+    """Un fichier JSON lines de `n_verses` versets par livre (mots tirés selon une loi de Zipf) ;
+    2 % des versets reprennent un récit commun"""
+    rng = random.Random(seed)
+    vocabulary = ['alliance', 'dieu', 'peuple', 'terre', 'prophète'] + [f"mot{i}" for i in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    os.makedirs(corpus_dir, exist_ok=True)
+    for book in books:
+        with open(os.path.join(corpus_dir, f"{book}.jsonl"), 'w', encoding='utf-8') as f:
+            for i in range(n_verses):
+                chapitre, verset = divmod(i, VERSES_PER_CHAPTER)
+                if rng.random() < 0.02:
+                    texte = rng.choice(NARRATIVES) + " " + " ".join(rng.choices(vocabulary, weights, k=3))
+                else:
+                    texte = " ".join(rng.choices(vocabulary, weights, k=rng.randint(8, 30)))
+                f.write(json.dumps({'livre': book, 'chapitre': chapitre + 1, 'verset': verset + 1,
+                                    'texte': texte}, ensure_ascii=False) + "\n")
+
+
+def percentiles(samples):
+    """p50 / p90 / p99 / max en millisecondes"""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {
+        'p50': round(pick(0.50), 3),
+        'p90': round(pick(0.90), 3),
+        'p99': round(pick(0.99), 3),
+        'max': round(ordered[-1], 3),
+        'n': len(ordered)
+    }
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_iterations(dashboard, sections, iterations):
+    """Temps par section (noms de méthodes, ou {mesure: appel}), plus la sérialisation des figures produites"""
+    calls = sections if isinstance(sections, dict) else {name: getattr(dashboard, name) for name in sections}
+    samples = {name: [] for name in calls}
+    samples['serialisation_figures'] = []
+    for _ in range(iterations):
+        st.reset()
+        for name, call in calls.items():
+            samples[name].append(time_call(call))
+        samples['serialisation_figures'].append(
+            time_call(lambda: [fig.to_json() for fig in st.figures]))
+    return samples
+
+
+def bench_loading(iterations):
+    """Chargement des données de référence (hors cache)"""
+    dashboard = Sacrement.SacredBooksDashboard(StaticDataLayer((None, None, None)), NoFigureCache())
+    return {'build_data_layer': [time_call(dashboard.build_data_layer) for _ in range(iterations)]}
+
+
+def bench_books(n_books, iterations):
+    """Rerun complet avec `n_books` livres synthétiques, puis rerun par défaut (rendu paresseux)"""
+    dashboard = Sacrement.SacredBooksDashboard(StaticDataLayer(synthetic_data(n_books)), NoFigureCache())
+    samples = run_iterations(dashboard, SECTIONS, iterations)
+    lazy = run_iterations(dashboard, ['run_dashboard'], iterations)
+    samples['rerun_paresseux'] = lazy['run_dashboard']
+    samples['serialisation_paresseux'] = lazy['serialisation_figures']
+    return samples
+
+
+def bench_timeline(n_events, iterations):
+    """Frise chronologique avec `n_events` événements"""
+    data = synthetic_data(3)
+    dashboard = Sacrement.SacredBooksDashboard(StaticDataLayer(data), NoFigureCache())
+    timeline = synthetic_timeline(n_events, list(data[0]))
+    dashboard.load_timeline_data = lambda: timeline
+    return run_iterations(dashboard, ['create_historical_timeline'], iterations)
+
+
+def bench_corpus(n_verses, iterations):
+    """Corpus synthétique de `n_verses` versets par livre : construction des artefacts, sections
+    recherche, concordance et parallèles, puis rendu paresseux de chaque focus d'analyse"""
+    from corpus import CORPUS_DIR
+    from pipeline import update
+
+    data = synthetic_data(3)
+    synthetic_corpus(CORPUS_DIR, list(data[0]), n_verses)
+    samples = {'construction_artefacts': [time_call(functools.partial(update, workers=1, force=True))]}
+
+    dashboard = Sacrement.SacredBooksDashboard(StaticDataLayer(data), NoFigureCache())
+    st.inputs.update(CORPUS_INPUTS)
+    samples.update(run_iterations(dashboard, CORPUS_SECTIONS, iterations))
+
+    view = dashboard.filtered_view()
+    focuses = ["Vue d'ensemble"] + list(Sacrement.SacredBooksDashboard.SECTIONS)
+    lazy = run_iterations(dashboard, {
+        f"paresseux_{focus}": functools.partial(dashboard.render_focused_section, focus, view)
+        for focus in focuses
+    }, iterations)
+    lazy['serialisation_paresseux'] = lazy.pop('serialisation_figures')
+    samples.update(lazy)
+    return samples
+
+
+def run(args):
+    """Exécute tous les scénarios ; résultats {scénario: {mesure: percentiles}}"""
+    results = {'chargement': {name: percentiles(samples)
+                              for name, samples in bench_loading(args.iterations).items()}}
+    for n_books in args.books:
+        results[f"livres_{n_books}"] = {name: percentiles(samples) for name, samples
+                                         in bench_books(n_books, args.iterations).items()}
+        print(f"livres_{n_books} : terminé", file=sys.stderr)
+    for n_events in args.events:
+        results[f"frise_{n_events}"] = {name: percentiles(samples) for name, samples
+                                        in bench_timeline(n_events, args.timeline_iterations).items()}
+        print(f"frise_{n_events} : terminé", file=sys.stderr)
+    for n_verses in args.verses:
+        results[f"corpus_{n_verses}"] = {name: percentiles(samples) for name, samples
+                                         in bench_corpus(n_verses, args.iterations).items()}
+        print(f"corpus_{n_verses} : terminé", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta=0.0):
+    """Mesures dont le p50 dépasse la référence de plus de `tolerance` et d'au moins `min_delta` ms"""
+    regressions = []
+    for scenario, measures in results.items():
+        for name, stats in measures.items():
+            reference = baseline.get(scenario, {}).get(name)
+            if reference and stats['p50'] > max(reference['p50'] * (1 + tolerance), reference['p50'] + min_delta):
+                regressions.append((scenario, name, reference['p50'], stats['p50']))
+    return regressions
+
+
+def report(results):
+    print(f"{'scénario':<16} {'mesure':<30} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}")
+    for scenario, measures in results.items():
+        for name, stats in measures.items():
+            print(f"{scenario:<16} {name:<30} {stats['p50']:>10.2f} {stats['p90']:>10.2f} "
+                  f"{stats['p99']:>10.2f} {stats['max']:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du rendu du dashboard (ms)")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--books', type=int, nargs='*', default=[10, 100, 1000])
+    parser.add_argument('--events', type=int, nargs='*', default=[10000])
+    parser.add_argument('--timeline-iterations', type=int, default=3)
+    parser.add_argument('--verses', type=int, nargs='*', default=[20000],
+                        help="Versets par livre du corpus synthétique")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="Hausse relative du p50 tolérée avant échec (0.5 = +50 %%)")
+    parser.add_argument('--min-delta', type=float, default=1.0,
+                        help="Hausse absolue du p50 (ms) ignorée, pour les mesures de quelques microsecondes")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--json', help="Écrit les résultats dans ce fichier")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Référence introuvable : {args.baseline} (l'enregistrer avec --update-baseline)", file=sys.stderr)
+        return 1
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+    for scenario, name, before, after in regressions:
+        print(f"RÉGRESSION {scenario}/{name} : p50 {before:.2f} ms -> {after:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# import_budget.py
+"""Budget de temps d'import du dashboard, mesuré avec `python -X importtime`
+
+    python benchmarks/import_budget.py                 # échoue si le budget est dépassé
+    python benchmarks/import_budget.py --budget-ms 50 --top 20
+
+Streamlit est importé avant le dashboard, comme dans le serveur : seul le graphe de modules
+propre à l'application est compté.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Temps d'import cumulé toléré pour Sacrement (ms)
+IMPORT_BUDGET_MS = 30
+
+# Modules qui ne doivent être chargés qu'à l'affichage d'une section
+DEFERRED_MODULES = ['pandas', 'numpy', 'plotly.express', 'plotly.graph_objects', 'pyarrow']
+
+
+def measure(module='Sacrement'):
+    """Lignes de `-X importtime` pour l'import de `module` : [(nom, profondeur, propre µs, cumulé µs)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import streamlit; import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+
+    # Les modules chargés par `import module` précèdent sa ligne, jusqu'à la fin de streamlit
+    end = next(i for i, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = max(i for i, row in enumerate(rows[:end]) if row[0] == 'streamlit' and row[1] == 0) + 1
+    return rows[start:end + 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget de temps d'import du dashboard")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help="Modules les plus coûteux affichés")
+    args = parser.parse_args(argv)
+
+    rows = measure()
+    total_ms = rows[-1][3] / 1000
+    print(f"Sacrement : {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, _, self_us, cumulative_us in sorted(rows[:-1], key=lambda row: -row[2])[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  {cumulative_us / 1000:8.2f} ms  {name}")
+
+    failures = []
+    loaded = {row[0] for row in rows}
+    failures += [f"{name} importé au chargement du module" for name in DEFERRED_MODULES if name in loaded]
+    if total_ms > args.budget_ms:
+        failures.append(f"budget dépassé : {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"ÉCHEC {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
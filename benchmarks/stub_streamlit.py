@@ -0,0 +1,117 @@
+# stub_streamlit.py
+"""Module `streamlit` factice pour exécuter le dashboard sans serveur ni navigateur"""
+import functools
+import sys
+import types
+
+
+class Block:
+    """Conteneur factice (colonnes, onglets, expander, sidebar...)"""
+
+    def __init__(self, stub):
+        self._stub = stub
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._stub, name)
+
+
+class StubStreamlit(types.ModuleType):
+    """Reproduit l'API utilisée par le dashboard ; les figures affichées sont conservées"""
+
+    def __init__(self):
+        super().__init__('streamlit')
+        self.figures = []
+        self.session_state = {}
+        self.sidebar = Block(self)
+        # Valeurs saisies dans les widgets, par clé (ou libellé)
+        self.inputs = {}
+
+    def reset(self):
+        self.figures = []
+
+    # Ressources partagées : mémorisées par arguments, comme sur le serveur
+    def cache_resource(self, func=None, max_entries=None, **kwargs):
+        if func is None:
+            return lambda f: self.cache_resource(f, max_entries=max_entries)
+        entries = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            if key not in entries:
+                if max_entries is not None and len(entries) >= max_entries:
+                    entries.clear()
+                entries[key] = func(*args, **kwargs)
+            return entries[key]
+        wrapper.clear = entries.clear
+        return wrapper
+
+    # Données : recalculées à chaque appel
+    def cache_data(self, func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+    # Mise en page
+    def columns(self, spec, **kwargs):
+        count = spec if isinstance(spec, int) else len(spec)
+        return [Block(self) for _ in range(count)]
+
+    def tabs(self, labels):
+        return [Block(self) for _ in labels]
+
+    def expander(self, *args, **kwargs):
+        return Block(self)
+
+    def spinner(self, *args, **kwargs):
+        return Block(self)
+
+    def container(self, *args, **kwargs):
+        return Block(self)
+
+    def empty(self):
+        return Block(self)
+
+    # Widgets : valeur par défaut
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return options[index] if options else None
+
+    def radio(self, label, options, index=0, **kwargs):
+        return self.selectbox(label, options, index)
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    toggle = checkbox
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default) if default is not None else []
+
+    def text_input(self, label, value='', **kwargs):
+        return self.inputs.get(kwargs.get('key', label), value)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    # Affichage
+    def plotly_chart(self, fig, **kwargs):
+        self.figures.append(fig)
+
+    def __getattr__(self, name):
+        # markdown, metric, write, dataframe, subheader... : sans effet
+        return lambda *args, **kwargs: Block(self)
+
+
+def install():
+    """Remplace `streamlit` dans sys.modules par le module factice"""
+    stub = StubStreamlit()
+    sys.modules['streamlit'] = stub
+    return stub
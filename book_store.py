@@ -0,0 +1,303 @@
+# book_store.py
+"""Stockage colonnaire (Arrow IPC / Parquet) des métadonnées des livres et de leurs éditions"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow est optionnel : sans lui, seules les données intégrées sont disponibles
+    pa = None
+
+# Fichier du magasin : .arrow / .feather (mappé en mémoire, zéro copie) ou .parquet
+BOOK_STORE_FILE = os.environ.get(
+    "SACREMENT_BOOK_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "livres.arrow")
+)
+
+# Schéma : (colonne, type Arrow) ; une ligne par édition d'un livre
+SCHEMA_FIELDS = [
+    ('livre', 'string'),
+    ('edition', 'string'),
+    ('edition_defaut', 'bool'),
+    ('nom_complet', 'string'),
+    ('religion', 'string'),
+    ('langue_originale', 'string'),
+    ('date_revelation', 'string'),
+    ('nombre_sourates', 'int32'),
+    ('nombre_versets', 'int32'),
+    ('nombre_mots', 'int64'),
+    ('nombre_lettres', 'int64'),
+    ('periodicite_revelation', 'string'),
+    ('lieu_revelation', 'string'),
+    ('conservation', 'string'),
+    ('style', 'string'),
+    ('theme_principal', 'string'),
+    ('division_principale', 'string'),
+    ('premier_verset', 'string'),
+    ('dernier_verset', 'string'),
+    ('couleur', 'string'),
+    ('duree_revelation_annees', 'int32'),
+    ('langues_traduction', 'int32'),
+    ('nombre_religions', 'int32'),
+    ('annees_depuis_revelation', 'int32'),
+    ('pourcentage_monde_influence', 'float64')
+]
+
+# Colonnes obligatoires d'une ligne ajoutée ; les autres peuvent rester vides
+REQUIRED_FIELDS = ['livre', 'edition']
+
+# Valeurs affichées pour les cellules laissées vides
+MISSING_TEXT = "Non renseigné"
+MISSING_COLOR = "#888888"
+
+# Colonnes du magasin -> colonnes de comparison_data
+COMPARISON_COLUMNS = {
+    'livre': 'Livre',
+    'nombre_versets': 'Nombre de versets',
+    'nombre_mots': 'Nombre de mots',
+    'duree_revelation_annees': 'Durée révélation (années)',
+    'langues_traduction': 'Nombre de langues traduit',
+    'nombre_religions': 'Nombre de religions',
+    'annees_depuis_revelation': 'Années depuis révélation',
+    'pourcentage_monde_influence': 'Pourcentage monde influencé'
+}
+
+# Colonnes du magasin reprises dans books_data
+BOOK_FIELDS = [
+    'nom_complet', 'religion', 'langue_originale', 'date_revelation', 'nombre_sourates',
+    'nombre_versets', 'nombre_mots', 'nombre_lettres', 'periodicite_revelation', 'lieu_revelation',
+    'conservation', 'style', 'theme_principal', 'division_principale', 'premier_verset',
+    'dernier_verset', 'couleur'
+]
+
+# Données de référence intégrées (utilisées sans fichier de magasin)
+BUILTIN_BOOKS = [
+    {
+        'livre': 'Coran',
+        'edition': 'Référence',
+        'edition_defaut': True,
+        'nom_complet': 'Al-Quran (القرآن)',
+        'religion': 'Islam',
+        'langue_originale': 'Arabe',
+        'date_revelation': '610-632 EC',
+        'nombre_sourates': 114,
+        'nombre_versets': 6236,
+        'nombre_mots': 77439,
+        'nombre_lettres': 323015,
+        'periodicite_revelation': '23 ans',
+        'lieu_revelation': 'La Mecque et Médine',
+        'conservation': 'Mémorisation et écriture',
+        'style': 'Poétique et rythmé',
+        'theme_principal': 'Monothéisme, Législation, Éthique',
+        'division_principale': 'Sourates, Versets',
+        'premier_verset': "Lis au nom de ton Seigneur qui a créé",
+        'dernier_verset': "Et craignez le jour où vous serez ramenés vers Allah",
+        'couleur': '#2E86AB',
+        'duree_revelation_annees': 23,
+        'langues_traduction': 150,
+        'nombre_religions': 1,
+        'annees_depuis_revelation': 1400,
+        'pourcentage_monde_influence': 24
+    },
+    {
+        'livre': 'Torah',
+        'edition': 'Référence',
+        'edition_defaut': True,
+        'nom_complet': 'Torah (תּוֹרָה)',
+        'religion': 'Judaïsme',
+        'langue_originale': 'Hébreu',
+        'date_revelation': 'XIIIe siècle AEC (tradition)',
+        'nombre_sourates': 5,
+        'nombre_versets': 5845,
+        'nombre_mots': 79258,
+        'nombre_lettres': 304805,
+        'periodicite_revelation': '40 jours (Mont Sinaï)',
+        'lieu_revelation': 'Mont Sinaï',
+        'conservation': 'Rouleaux manuscrits',
+        'style': 'Narratif et législatif',
+        'theme_principal': 'Alliance, Loi, Histoire des Patriarches',
+        'division_principale': 'Livres, Parashiyot',
+        'premier_verset': "Au commencement, Dieu créa les cieux et la terre",
+        'dernier_verset': "Et il n'a plus paru en Israël de prophète comme Moïse",
+        'couleur': '#A23B72',
+        'duree_revelation_annees': 1,
+        'langues_traduction': 10,
+        'nombre_religions': 1,
+        'annees_depuis_revelation': 3300,
+        'pourcentage_monde_influence': 0.2
+    },
+    {
+        'livre': 'Bible',
+        'edition': 'Référence',
+        'edition_defaut': True,
+        'nom_complet': 'Bible (Βίβλος)',
+        'religion': 'Christianisme',
+        'langue_originale': 'Hébreu, Araméen, Grec',
+        'date_revelation': '1500 AEC - 100 EC',
+        'nombre_sourates': 73,
+        'nombre_versets': 35678,
+        'nombre_mots': 727969,
+        'nombre_lettres': 3100000,
+        'periodicite_revelation': '1600 ans',
+        'lieu_revelation': 'Moyen-Orient, Méditerranée',
+        'conservation': 'Manuscrits, Codex',
+        'style': 'Narratif, Poétique, Épistolaire',
+        'theme_principal': 'Salut, Amour, Rédemption',
+        'division_principale': 'Ancien/Nouveau Testament, Livres',
+        'premier_verset': "Au commencement, Dieu créa les cieux et la terre",
+        'dernier_verset': "Que la grâce du Seigneur Jésus soit avec tous",
+        'couleur': '#F18F01',
+        'duree_revelation_annees': 1600,
+        'langues_traduction': 3500,
+        'nombre_religions': 3,
+        'annees_depuis_revelation': 2000,
+        'pourcentage_monde_influence': 33
+    }
+]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow est requis pour lire ou écrire le magasin de livres (pip install pyarrow)")
+
+
+def schema():
+    """Schéma Arrow du magasin"""
+    _require_pyarrow()
+    return pa.schema([(name, pa.type_for_alias(kind)) for name, kind in SCHEMA_FIELDS])
+
+
+def read_table(path=BOOK_STORE_FILE, columns=None):
+    """Table Arrow du magasin, mappée en mémoire (Arrow IPC) ou lue colonne par colonne (Parquet)"""
+    _require_pyarrow()
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+    expected = schema()
+    wanted = columns or expected.names
+    missing = [name for name in wanted if name not in table.schema.names]
+    if missing:
+        raise ValueError(f"{path} : colonnes manquantes {missing}")
+    return table.select(wanted).cast(pa.schema([expected.field(name) for name in wanted]))
+
+
+def default_editions(table):
+    """Une ligne par livre : la première édition par défaut, sinon la première édition du livre"""
+    flags = table['edition_defaut'].to_pylist()
+    chosen = {}
+    for row, book in enumerate(table['livre'].to_pylist()):
+        if book not in chosen or (flags[row] and not flags[chosen[book]]):
+            chosen[book] = row
+    return table.take(sorted(chosen.values()))
+
+
+def fill_missing(df):
+    """Cellules vides d'éditions partielles : 0 pour les nombres, couleur neutre, texte « Non renseigné »"""
+    values = {}
+    for name, kind in SCHEMA_FIELDS:
+        if kind == 'string':
+            values[name] = MISSING_COLOR if name == 'couleur' else MISSING_TEXT
+        else:
+            values[name] = False if kind == 'bool' else 0
+    df = df.fillna(values)
+    numeric = [name for name, kind in SCHEMA_FIELDS if kind.startswith('int')]
+    return df.astype({name: 'int64' for name in numeric})
+
+
+def load_book_table(path=BOOK_STORE_FILE):
+    """Éditions par défaut sous forme de DataFrame (données intégrées si le magasin n'existe pas)"""
+    if not os.path.exists(path):
+        return pd.DataFrame(BUILTIN_BOOKS)[[name for name, _ in SCHEMA_FIELDS]]
+    # Seules les lignes retenues sont converties en objets Python
+    return fill_missing(default_editions(read_table(path)).to_pandas())
+
+
+def normalize_records(records):
+    """Lignes conformes au schéma : cellules vides (NaN) -> None, entiers lus comme flottants -> int
+
+    ValueError si une colonne est inconnue, si une colonne obligatoire manque ou si une valeur
+    ne correspond pas au type de sa colonne.
+    """
+    kinds = dict(SCHEMA_FIELDS)
+    normalized = []
+    for number, record in enumerate(records, 1):
+        unknown = sorted(set(record) - set(kinds))
+        if unknown:
+            raise ValueError(f"ligne {number} : colonnes inconnues {unknown} (schéma : {list(kinds)})")
+        row = {}
+        for name, value in record.items():
+            if value is not None and pd.isna(value):
+                value = None
+            elif value is not None and kinds[name].startswith('int') and isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError(f"ligne {number} : {name} doit être un entier ({value!r})")
+                value = int(value)
+            elif value is not None and kinds[name] == 'string' and not isinstance(value, str):
+                value = str(value)
+            row[name] = value
+        missing = [name for name in REQUIRED_FIELDS if row.get(name) is None]
+        if missing:
+            raise ValueError(f"ligne {number} : colonnes obligatoires manquantes ou vides {missing}")
+        normalized.append(row)
+    return normalized
+
+
+def write_store(path=BOOK_STORE_FILE, records=BUILTIN_BOOKS):
+    """Écrit un magasin complet (Arrow IPC ou Parquet selon l'extension)"""
+    _require_pyarrow()
+    try:
+        table = pa.Table.from_pylist(normalize_records(records), schema=schema())
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as error:
+        raise ValueError(f"lignes non conformes au schéma du magasin : {error}") from error
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        pq.write_table(table, tmp)
+    else:
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def append_records(path, records):
+    """Ajoute des livres ou des éditions au magasin (lignes numérotées à partir de 1 dans les erreurs)"""
+    records = normalize_records(records)
+    existing = read_table(path).to_pylist() if os.path.exists(path) else list(BUILTIN_BOOKS)
+    write_store(path, existing + records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Magasin colonnaire des livres et éditions")
+    parser.add_argument('--store', default=BOOK_STORE_FILE)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('init', help="Écrit le magasin à partir des données intégrées")
+    append = commands.add_parser('append', help="Ajoute les lignes d'un fichier CSV ou JSON lines")
+    append.add_argument('path')
+    commands.add_parser('list', help="Liste les éditions du magasin")
+    args = parser.parse_args(argv)
+
+    if args.command == 'init':
+        write_store(args.store)
+    elif args.command == 'append':
+        # Colonnes texte lues telles quelles (« 610 » reste une chaîne), cellules vides -> NaN ;
+        # les lignes JSON gardent leurs propres types et leurs clés absentes
+        if args.path.endswith('.csv'):
+            text_columns = {name: str for name, kind in SCHEMA_FIELDS if kind == 'string'}
+            rows = pd.read_csv(args.path, dtype=text_columns).to_dict('records')
+        else:
+            with open(args.path, encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        append_records(args.store, rows)
+    else:
+        table = read_table(args.store, columns=['livre', 'edition', 'edition_defaut'])
+        print(table.to_pandas().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# charts.py
+"""Constructeurs des graphiques Plotly du dashboard (importés à l'affichage du premier graphique)"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+from normalization import radial_range
+
+# Couleurs des livres dans les graphiques
+BOOK_COLORS = {
+    'Coran': '#2E86AB',
+    'Torah': '#A23B72',
+    'Bible': '#F18F01'
+}
+# Livres sans couleur attribuée
+DEFAULT_BOOK_COLOR = '#7F7F7F'
+
+
+def build_bar_chart(df, y, title):
+    """Graphique barres d'une dimension par livre"""
+    return px.bar(df, x='Livre', y=y, color='Livre',
+                  color_discrete_map=BOOK_COLORS, title=title)
+
+
+# Au-delà, les radars ne sont plus remplis et les bulles partagent une seule trace
+LEGEND_MAX_BOOKS = 12
+
+
+def build_radar_chart(normalized, colors=None, method='max'):
+    """Radar chart pour comparaison multi-dimensionnelle (dimensions déjà normalisées)"""
+    colors = colors or BOOK_COLORS
+    dimensions = list(normalized.columns)
+    few = len(normalized) <= LEGEND_MAX_BOOKS
+
+    # Traces construites en une liste puis validées en une fois
+    traces = [dict(type='scatterpolar', r=list(values), theta=dimensions,
+                   fill='toself' if few else 'none', name=book, line=dict(color=colors.get(book, DEFAULT_BOOK_COLOR)))
+              for book, values in zip(normalized.index, normalized.to_numpy())]
+
+    return go.Figure(data=traces, layout=dict(
+        polar=dict(
+            radialaxis=dict(visible=True, range=radial_range(normalized, method))
+        ),
+        showlegend=few,
+        title="Profil Comparatif des Livres Sacrés",
+        height=500
+    ))
+
+
+def build_bubble_chart(df, colors=None):
+    """Diagramme en bulles versets / mots / durée (taille : colonne 'Taille', durée normalisée)"""
+    colors = colors or BOOK_COLORS
+    books = df['Livre'].to_numpy()
+    x = df['Nombre de versets'].to_numpy()
+    y = df['Nombre de mots'].to_numpy()
+    size = df['Taille'].to_numpy()
+    marker = dict(sizemode='area', sizeref=max(size.max(), 1) / 60 ** 2, sizemin=2)
+
+    if len(df) <= LEGEND_MAX_BOOKS:
+        traces = [dict(type='scatter', mode='markers', x=[x[i]], y=[y[i]], name=book,
+                       hovertext=[book], marker=dict(marker, size=[size[i]], color=colors.get(book, DEFAULT_BOOK_COLOR)))
+                  for i, book in enumerate(books)]
+    else:
+        traces = [dict(type='scatter', mode='markers', x=x, y=y, hovertext=books, showlegend=False,
+                       marker=dict(marker, size=size, color=[colors.get(book, DEFAULT_BOOK_COLOR) for book in books]))]
+
+    return go.Figure(data=traces, layout=dict(
+        title="Relation Versets-Mots-Durée",
+        xaxis_title='Nombre de versets',
+        yaxis_title='Nombre de mots'
+    ))
+
+
+def build_diffusion_chart(diffusion_df):
+    """Barres groupées de diffusion géographique"""
+    fig = go.Figure()
+    
+    for book in diffusion_df.columns.drop('Pays'):
+        fig.add_trace(go.Bar(name=book, x=diffusion_df['Pays'], y=diffusion_df[book],
+                             marker_color=BOOK_COLORS.get(book)))
+    
+    fig.update_layout(
+        title="Diffusion Géographique (%)",
+        barmode='group',
+        height=400
+    )
+    return fig
+
+
+def build_impact_chart(impact_df):
+    """Courbes d'impact culturel par domaine"""
+    fig = px.line(impact_df, x='Domaine', y=list(impact_df.columns.drop('Domaine')),
+                 title="Impact Culturel par Domaine (1-10)",
+                 color_discrete_map=BOOK_COLORS)
+    
+    fig.update_layout(height=400)
+    return fig
+
+
+def build_theme_heatmap(scores):
+    """Heatmap de l'importance des thèmes"""
+    fig = px.imshow(scores,
+                   title="Importance Relative des Thèmes (%)",
+                   color_continuous_scale='Viridis',
+                   aspect="auto")
+    
+    fig.update_layout(height=500)
+    return fig
+
+
+def build_length_histogram(histogram_df, colors=None):
+    """Histogramme des versets par nombre de mots (classes pré-agrégées, en % des versets du livre)"""
+    colors = colors or BOOK_COLORS
+    traces = []
+    for book, group in histogram_df.groupby('Livre', sort=False):
+        starts, ends = group['Début'].to_numpy(), group['Fin'].to_numpy()
+        traces.append(dict(type='bar', name=book, x=(starts + ends) / 2, width=ends - starts + 1,
+                           y=group['Part (%)'].round(3).tolist(), opacity=0.6,
+                           marker=dict(color=colors.get(book, DEFAULT_BOOK_COLOR)),
+                           customdata=list(zip(starts.tolist(), ends.tolist(), group['Versets'].tolist())),
+                           hovertemplate="%{customdata[0]}–%{customdata[1]} mots : %{customdata[2]} versets"
+                                         " (%{y:.2f} %)<extra>" + book + "</extra>"))
+    return go.Figure(data=traces, layout=dict(
+        title="Longueur des Versets (mots)",
+        barmode='overlay',
+        xaxis_title='Mots par verset',
+        yaxis_title='Part des versets (%)',
+        height=400
+    ))
+
+
+def build_chapter_words_chart(chapters_df, colors=None):
+    """Mots par chapitre (ou sourate) dans l'ordre du texte"""
+    colors = colors or BOOK_COLORS
+    traces = [dict(type='scatter', mode='lines', name=book, x=group['Chapitre'].tolist(),
+                   y=group['Mots'].round(1).tolist(), line=dict(color=colors.get(book, DEFAULT_BOOK_COLOR)))
+              for book, group in chapters_df.groupby('Livre', sort=False)]
+    return go.Figure(data=traces, layout=dict(
+        title="Mots par Chapitre",
+        xaxis_title='Chapitre (ordre du texte)',
+        yaxis_title='Mots',
+        height=400
+    ))
+
+
+def build_cumulative_chart(cumulative_df, colors=None):
+    """Part cumulée des mots selon la part des versets"""
+    colors = colors or BOOK_COLORS
+    traces = [dict(type='scatter', mode='lines', name=book, x=group['Versets (%)'].round(2).tolist(),
+                   y=group['Mots (%)'].round(2).tolist(), line=dict(color=colors.get(book, DEFAULT_BOOK_COLOR)))
+              for book, group in cumulative_df.groupby('Livre', sort=False)]
+    return go.Figure(data=traces, layout=dict(
+        title="Longueur Cumulée",
+        xaxis_title='Versets (%)',
+        yaxis_title='Mots (%)',
+        height=400
+    ))
@@ -0,0 +1,240 @@
+# corpus.py
+"""Ingestion en flux des textes sacrés et statistiques calculées sur les versets"""
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Répertoire des fichiers de versets : un fichier par livre (Coran.jsonl, Torah.txt, Bible.json...)
+CORPUS_DIR = os.environ.get(
+    "SACREMENT_CORPUS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "corpus")
+)
+CORPUS_EXTENSIONS = ('.jsonl', '.json', '.txt')
+
+# Taille des blocs lus dans les fichiers JSON (caractères)
+JSON_CHUNK_SIZE = 1 << 16
+
+# Calcul des statistiques : nombre de processus (1 = mode séquentiel) et taille des lots
+STATS_WORKERS = int(os.environ.get("SACREMENT_STATS_WORKERS", os.cpu_count() or 1))
+SHARD_VERSES = 2000
+
+WORD_RE = re.compile(r"\w+")
+
+Verse = namedtuple('Verse', ['livre', 'chapitre', 'verset', 'texte'])
+
+
+def corpus_files(corpus_dir=CORPUS_DIR):
+    """Associe chaque livre (nom du fichier sans extension) à son fichier de versets"""
+    files = {}
+    if not os.path.isdir(corpus_dir):
+        return files
+    for name in sorted(os.listdir(corpus_dir)):
+        book, ext = os.path.splitext(name)
+        if ext.lower() in CORPUS_EXTENSIONS and book not in files:
+            files[book] = os.path.join(corpus_dir, name)
+    return files
+
+
+def _record_to_verse(record):
+    """Convertit un enregistrement JSON en verset"""
+    return Verse(
+        str(record.get('livre', record.get('book', ''))),
+        int(record.get('chapitre', record.get('chapter', 0))),
+        int(record.get('verset', record.get('verse', 0))),
+        record.get('texte', record.get('text', ''))
+    )
+
+
+def _iter_text_verses(path):
+    """Versets d'un fichier texte : livre<TAB>chapitre<TAB>verset<TAB>texte par ligne"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            parts = line.split('\t', 3)
+            if len(parts) != 4:
+                raise ValueError(f"{path}:{line_number} : 4 colonnes attendues (livre, chapitre, verset, texte)")
+            yield Verse(parts[0], int(parts[1]), int(parts[2]), parts[3])
+
+
+def _iter_jsonl_verses(path):
+    """Versets d'un fichier JSON Lines : un objet par ligne"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield _record_to_verse(json.loads(line))
+
+
+def _iter_json_verses(path, chunk_size=JSON_CHUNK_SIZE):
+    """Versets d'un tableau JSON, décodé objet par objet sans charger le fichier entier"""
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        buffer, pos, opened = '', 0, False
+        while True:
+            while pos < len(buffer) and (buffer[pos] in ' \t\r\n,' or (buffer[pos] == '[' and not opened)):
+                opened = opened or buffer[pos] == '['
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    if buffer[pos:].strip():
+                        raise ValueError(f"{path} : tableau JSON incomplet")
+                    return
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield _record_to_verse(record)
+
+
+def iter_verses(path):
+    """Itère sur les versets d'un fichier selon son format"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.jsonl':
+        return _iter_jsonl_verses(path)
+    if ext == '.json':
+        return _iter_json_verses(path)
+    if ext == '.txt':
+        return _iter_text_verses(path)
+    raise ValueError(f"Format de corpus non supporté : {path}")
+
+
+def normalize(text):
+    """Minuscules sans signes diacritiques (accents, harakat, niqqud)"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    """Découpe un texte normalisé en mots"""
+    return WORD_RE.findall(normalize(text))
+
+
+def token_spans(text):
+    """Positions (début, fin) dans `text` des mots de tokenize(text), dans le même ordre"""
+    # Texte normalisé caractère par caractère, en notant le caractère d'origine de chacun
+    chars, origin = [], []
+    for i, c in enumerate(text):
+        for d in unicodedata.normalize('NFKD', c):
+            if not unicodedata.combining(d):
+                folded = d.casefold()
+                chars.append(folded)
+                origin.extend([i] * len(folded))
+    spans = []
+    for match in WORD_RE.finditer(''.join(chars)):
+        end = origin[match.end() - 1] + 1
+        # Les signes diacritiques qui suivent le mot (harakat, niqqud) en font partie
+        while end < len(text) and unicodedata.combining(text[end]):
+            end += 1
+        spans.append((origin[match.start()], end))
+    return spans
+
+
+class BookStats:
+    """Agrégats d'un livre calculés en une seule passe sur ses versets"""
+
+    def __init__(self):
+        self.versets = 0
+        self.mots = 0
+        self.lettres = 0
+        self.divisions = set()
+        self.chapitres = set()
+        self.vocabulaire = set()
+        self.longueur_max = 0
+
+    def add(self, verse):
+        """Ajoute un verset aux agrégats"""
+        normalized = normalize(verse.texte)
+        words = WORD_RE.findall(normalized)
+        self.versets += 1
+        self.mots += len(words)
+        self.lettres += sum(1 for c in normalized if c.isalpha())
+        self.divisions.add(verse.livre)
+        self.chapitres.add((verse.livre, verse.chapitre))
+        self.vocabulaire.update(words)
+        self.longueur_max = max(self.longueur_max, len(words))
+
+    def merge(self, other):
+        """Fusionne les agrégats d'un lot de versets qui suit ceux-ci dans le texte"""
+        self.versets += other.versets
+        self.mots += other.mots
+        self.lettres += other.lettres
+        self.divisions |= other.divisions
+        self.chapitres |= other.chapitres
+        self.vocabulaire |= other.vocabulaire
+        self.longueur_max = max(self.longueur_max, other.longueur_max)
+        return self
+
+    def as_dict(self):
+        """Valeurs au format de books_data"""
+        # Un livre sans sous-livres (Coran) est divisé en chapitres (sourates)
+        divisions = len(self.divisions) if len(self.divisions) > 1 else len(self.chapitres)
+        return {
+            'nombre_sourates': divisions,
+            'nombre_versets': self.versets,
+            'nombre_mots': self.mots,
+            'nombre_lettres': self.lettres,
+            'taille_vocabulaire': len(self.vocabulaire),
+            'longueur_max_verset': self.longueur_max
+        }
+
+
+def iter_shards(verses, size=SHARD_VERSES):
+    """Regroupe les versets en lots d'au moins `size` versets, coupés entre deux chapitres"""
+    shard = []
+    for verse in verses:
+        if len(shard) >= size and (verse.livre, verse.chapitre) != (shard[-1].livre, shard[-1].chapitre):
+            yield shard
+            shard = []
+        shard.append(verse)
+    if shard:
+        yield shard
+
+
+def _shard_stats(shard):
+    """Agrégats d'un lot de versets (exécuté dans un processus de travail)"""
+    stats = BookStats()
+    for verse in shard:
+        stats.add(verse)
+    return stats
+
+
+def compute_book_stats(path, executor=None, max_pending=None):
+    """Statistiques d'un fichier de versets, en flux, réparties sur `executor` s'il est fourni"""
+    if executor is None:
+        return _shard_stats(iter_verses(path))
+
+    # Les lots sont fusionnés dans l'ordre du texte : le résultat est identique au mode séquentiel
+    stats = BookStats()
+    pending = deque()
+    for shard in iter_shards(iter_verses(path)):
+        pending.append(executor.submit(_shard_stats, shard))
+        if max_pending and len(pending) >= max_pending:
+            stats.merge(pending.popleft().result())
+    while pending:
+        stats.merge(pending.popleft().result())
+    return stats
+
+
+def compute_corpus_stats(corpus_dir=CORPUS_DIR, workers=STATS_WORKERS):
+    """Statistiques de chaque livre présent dans le corpus (workers=1 : un seul processus)"""
+    files = corpus_files(corpus_dir)
+    if workers <= 1 or not files:
+        return {book: compute_book_stats(path).as_dict() for book, path in files.items()}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return {book: compute_book_stats(path, executor, max_pending=2 * workers).as_dict()
+                for book, path in files.items()}
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else CORPUS_DIR
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else STATS_WORKERS
+    print(json.dumps(compute_corpus_stats(directory, workers), ensure_ascii=False, indent=2))
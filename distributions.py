@@ -0,0 +1,102 @@
+# distributions.py
+"""Distributions des longueurs de versets et de chapitres, pré-agrégées en tableaux NumPy
+
+Les histogrammes sont calculés une fois par livre avec des classes d'un mot ; une période
+de zoom est regroupée en au plus MAX_BINS classes (np.add.reduceat), si bien que les figures
+ne transportent que des agrégats, quel que soit le nombre de versets.
+"""
+import numpy as np
+import pandas as pd
+
+# Classes d'un histogramme, points d'une courbe de mots par chapitre, points d'une courbe cumulée
+MAX_BINS = 60
+MAX_POINTS = 400
+CURVE_POINTS = 200
+
+
+class Distributions:
+    """Agrégats par livre : histogramme fin des mots par verset, mots par chapitre, cumul"""
+
+    def __init__(self, store, word_counts):
+        self.books = [book for book in store.books if book in word_counts]
+        self.histograms = {}
+        self.chapter_words = {}
+        self.cumulative_words = {}
+        for book in self.books:
+            words = np.asarray(word_counts[book], dtype=np.int64)
+            self.histograms[book] = np.bincount(words, minlength=1)
+
+            # Chapitres dans l'ordre du texte : suites de versets de même (division, chapitre)
+            references = np.asarray(store[book].references, dtype=np.int64).reshape(-1, 3)
+            keys = (references[:, 0] << 16) | references[:, 1]
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+            self.chapter_words[book] = np.add.reduceat(words, starts) if len(words) else words
+
+            self.cumulative_words[book] = np.cumsum(words)
+
+    def word_range(self, books=None):
+        """Plus petit et plus grand nombre de mots d'un verset des livres `books`"""
+        histograms = [self.histograms[book] for book in (self.books if books is None else books) if book in self.histograms]
+        used = [np.flatnonzero(histogram) for histogram in histograms]
+        used = [values for values in used if len(values)]
+        if not used:
+            return 0, 0
+        return int(min(values[0] for values in used)), int(max(values[-1] for values in used))
+
+    def histogram(self, books=None, low=None, high=None, max_bins=MAX_BINS):
+        """Versets par classe de longueur (mots) entre `low` et `high` : classes plus fines au zoom"""
+        books = [book for book in (self.books if books is None else books) if book in self.histograms]
+        first, last = self.word_range(books)
+        low = first if low is None else low
+        high = last if high is None else high
+        width = max(1, -(-(high - low + 1) // max_bins))
+        edges = np.arange(low, high + 1, width)
+
+        frames = []
+        for book in books:
+            fine = np.zeros(high + 1, dtype=np.int64)
+            counts = self.histograms[book][:high + 1]
+            fine[:len(counts)] = counts
+            binned = np.add.reduceat(fine[low:], edges - low)
+            total = max(int(self.histograms[book].sum()), 1)
+            frames.append(pd.DataFrame({
+                'Livre': book,
+                'Début': edges,
+                'Fin': np.minimum(edges + width - 1, high),
+                'Versets': binned,
+                'Part (%)': 100 * binned / total
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=['Livre', 'Début', 'Fin', 'Versets', 'Part (%)'])
+
+    def chapters(self, books=None, max_points=MAX_POINTS):
+        """Mots par chapitre dans l'ordre du texte ; moyenne par groupe de chapitres au-delà de `max_points`"""
+        frames = []
+        for book in (self.books if books is None else books):
+            words = self.chapter_words.get(book)
+            if words is None or len(words) == 0:
+                continue
+            size = max(1, -(-len(words) // max_points))
+            starts = np.arange(0, len(words), size)
+            frames.append(pd.DataFrame({
+                'Livre': book,
+                'Chapitre': starts + 1,
+                'Mots': np.add.reduceat(words, starts) / np.diff(np.append(starts, len(words)))
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Livre', 'Chapitre', 'Mots'])
+
+    def cumulative(self, books=None, points=CURVE_POINTS):
+        """Part cumulée des mots selon la part des versets lus, échantillonnée en `points` points"""
+        frames = []
+        for book in (self.books if books is None else books):
+            cumulative = self.cumulative_words.get(book)
+            if cumulative is None or len(cumulative) == 0:
+                continue
+            positions = np.unique(np.linspace(0, len(cumulative) - 1, points).round().astype(np.int64))
+            frames.append(pd.DataFrame({
+                'Livre': book,
+                'Versets (%)': 100 * (positions + 1) / len(cumulative),
+                'Mots (%)': 100 * cumulative[positions] / max(int(cumulative[-1]), 1)
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=['Livre', 'Versets (%)', 'Mots (%)'])
@@ -0,0 +1,186 @@
+# figure_cache.py
+"""Cache disque des figures Plotly sérialisées, indexé par l'empreinte des données"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+
+FIGURE_CACHE_DIR = os.environ.get(
+    "SACREMENT_FIGURE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "figures")
+)
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get("SACREMENT_FIGURE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Figures déjà désérialisées gardées en mémoire devant le disque
+FIGURE_MEMORY_ENTRIES = int(os.environ.get("SACREMENT_FIGURE_MEMORY_ENTRIES", 64))
+
+
+def data_fingerprint(data):
+    """Empreinte du contenu des données d'entrée d'un graphique"""
+    import pandas as pd
+    digest = hashlib.sha256()
+    if isinstance(data, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        digest.update(str(data.name).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Figures JSON sur disque, éviction LRU au-delà de `max_bytes` ; persiste entre les redémarrages
+
+    Les `memory_entries` figures les plus récentes restent en mémoire : relire le JSON reconstruit
+    et revalide une go.Figure, plus coûteux que de construire les petits graphiques. Les figures
+    rendues sont partagées et ne doivent pas être modifiées.
+    """
+
+    def __init__(self, directory=FIGURE_CACHE_DIR, max_bytes=FIGURE_CACHE_MAX_BYTES,
+                 memory_entries=FIGURE_MEMORY_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._sources = {}
+        os.makedirs(directory, exist_ok=True)
+
+        # Index des entrées existantes, du moins au plus récemment utilisé
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._size = sum(self._entries.values())
+
+    def _source_digest(self, builder):
+        """Empreinte du fichier source du constructeur : modifier le code invalide ses figures"""
+        path = inspect.getsourcefile(builder)
+        stat = os.stat(path)
+        cached = self._sources.get(path)
+        if cached is None or cached[0] != (stat.st_size, stat.st_mtime_ns):
+            with open(path, 'rb') as f:
+                cached = ((stat.st_size, stat.st_mtime_ns), hashlib.sha256(f.read()).hexdigest())
+            self._sources[path] = cached
+        return cached[1]
+
+    def key(self, builder, data, params):
+        """Clé d'une figure : constructeur, données et paramètres du graphique"""
+        import plotly
+        digest = hashlib.sha256()
+        digest.update(f"{builder.__module__}.{builder.__qualname__}:{plotly.__version__}".encode())
+        digest.update(self._source_digest(builder).encode())
+        digest.update(data_fingerprint(data).encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, fig, size):
+        """Garde une figure en mémoire (LRU de `memory_entries` figures)"""
+        with self._lock:
+            self._memory[key] = (fig, size)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_build(self, builder, data, **params):
+        """Relit la figure en cache ou la construit avec builder(data, **params) et la stocke"""
+        return self.get_or_build_sized(builder, data, **params)[0]
+
+    def get_or_build_sized(self, builder, data, **params):
+        """(figure, taille du JSON en octets) : mémoire, puis disque, puis construction"""
+        key = self.key(builder, data, params)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+        if cached is not None:
+            return cached
+
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = f.read()
+        except FileNotFoundError:
+            payload = None
+
+        if payload is not None:
+            with self._lock:
+                self.hits += 1
+                size = len(payload.encode('utf-8'))
+                self._size += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            import plotly.io as pio
+            fig = pio.from_json(payload, skip_invalid=True)
+            self._remember(key, fig, size)
+            return fig, size
+
+        fig = builder(data, **params)
+        payload = fig.to_json()
+        size = len(payload.encode('utf-8'))
+        self._store(key, payload)
+        self._remember(key, fig, size)
+        with self._lock:
+            self.misses += 1
+        return fig, size
+
+    def _store(self, key, payload):
+        """Écrit une figure (remplacement atomique) puis évince les moins récentes"""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+
+        size = len(payload.encode('utf-8'))
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        """Supprime toutes les figures du cache"""
+        with self._lock:
+            self._memory.clear()
+            for key in self._entries:
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Compteurs du cache"""
+        return {
+            'hits': self.hits,
+            'hits mémoire': self.memory_hits,
+            'misses': self.misses,
+            'figures': len(self._entries),
+            'figures en mémoire': len(self._memory),
+            'taille (Ko)': round(self._size / 1024, 1),
+            'taille max (Ko)': round(self.max_bytes / 1024, 1)
+        }
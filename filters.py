@@ -0,0 +1,95 @@
+# filters.py
+"""Vues filtrées des données par sélection de livres, partagées entre les sections et les sessions"""
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from types import MappingProxyType
+
+from normalization import RADAR_DIMENSIONS, normalize
+
+# Nombre de combinaisons de livres conservées
+VIEW_CACHE_MAX_ENTRIES = int(os.environ.get("SACREMENT_VIEW_CACHE_MAX_ENTRIES", "64"))
+
+
+class BookView:
+    """Données restreintes aux livres sélectionnés ; chaque sous-ensemble est calculé au premier accès"""
+
+    def __init__(self, books, data):
+        self.books = tuple(books)
+        self._selected = frozenset(self.books)
+        self._data = data
+        self._normalized = {}
+        self._timeline = None
+
+    @cached_property
+    def books_data(self):
+        books_data = self._data[0]
+        return MappingProxyType({book: books_data[book] for book in self.books})
+
+    @cached_property
+    def comparison_data(self):
+        comparison_data = self._data[1]
+        return comparison_data[comparison_data['Livre'].isin(self._selected)].reset_index(drop=True)
+
+    @cached_property
+    def thematic_data(self):
+        thematic_data = self._data[2]
+        scores = thematic_data['scores']
+        return MappingProxyType({
+            'scores': scores[[book for book in scores.columns if book in self._selected]],
+            'themes_cles': MappingProxyType({book: themes for book, themes in thematic_data['themes_cles'].items()
+                                             if book in self._selected})
+        })
+
+    @cached_property
+    def colors(self):
+        return {book: data['couleur'] for book, data in self.books_data.items()}
+
+    @cached_property
+    def total_verses(self):
+        return int(sum(data['nombre_versets'] for data in self.books_data.values()))
+
+    def normalized(self, method):
+        """Dimensions du radar normalisées sur les livres de la vue, une fois par méthode"""
+        if method not in self._normalized:
+            self._normalized[method] = normalize(self.comparison_data, RADAR_DIMENSIONS, method)
+        return self._normalized[method]
+
+    def timeline(self, timeline_df):
+        """Événements de la frise des livres de la vue (refiltrés seulement si la frise change)"""
+        if self._timeline is None or self._timeline[0] is not timeline_df:
+            filtered = timeline_df[timeline_df['Livre'].isin(self._selected)].reset_index(drop=True)
+            self._timeline = (timeline_df, filtered)
+        return self._timeline[1]
+
+    def book_columns(self, df, key):
+        """Colonne `key` et colonnes des livres de la vue (tableaux au format large)"""
+        return df[[key] + [column for column in df.columns if column in self._selected]]
+
+
+class ViewCache:
+    """Une vue par combinaison de livres (LRU) ; invalidée quand les données changent"""
+
+    def __init__(self, max_entries=VIEW_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = None
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, data, books):
+        """Vue des données `data` (books_data, comparison_data, thematic_data) pour `books`"""
+        with self._lock:
+            if data is not self._data:
+                self._data = data
+                self._views.clear()
+            key = frozenset(books)
+            view = self._views.get(key)
+            if view is None:
+                # Ordre des livres : celui des données, quel que soit l'ordre de sélection
+                view = BookView([book for book in data[0] if book in key], data)
+                self._views[key] = view
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_entries:
+                self._views.popitem(last=False)
+            return view
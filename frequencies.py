@@ -0,0 +1,212 @@
+# frequencies.py
+"""Fréquences de mots, n-grammes et TF-IDF vectorisés (NumPy) sur les textes sacrés"""
+import json
+import os
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from corpus import CORPUS_DIR, corpus_files, iter_verses, normalize, tokenize
+
+# Lexiques thématiques (JSON {thème: [mots]}) ; à défaut, DEFAULT_THEMES
+THEMES_FILE = os.environ.get(
+    "SACREMENT_THEMES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "themes.json")
+)
+
+DEFAULT_THEMES = {
+    'Monothéisme': ['dieu', 'seigneur', 'allah', 'éternel', 'unique', 'créateur', 'tout-puissant', 'adorer'],
+    'Prophètes': ['prophète', 'prophètes', 'messager', 'envoyé', 'moïse', 'abraham', 'noé', 'jésus', 'david', 'élie'],
+    'Loi Divine': ['loi', 'commandement', 'commandements', 'ordonnance', 'ordonnances', 'statut', 'statuts', 'prescrit', 'licite', 'illicite'],
+    'Éthique': ['juste', 'justice', 'bien', 'mal', 'vérité', 'pauvre', 'orphelin', 'veuve', 'aumône', 'bonté'],
+    'Histoire Sacrée': ['engendra', 'pères', 'peuple', 'israël', 'égypte', 'roi', 'pays', 'générations', 'tribu', 'alliance'],
+    'Salut': ['salut', 'sauver', 'sauvé', 'pardon', 'pardonner', 'miséricorde', 'grâce', 'rédemption', 'repentir', 'délivrer'],
+    'Fin des Temps': ['jugement', 'résurrection', 'enfer', 'paradis', 'heure', 'royaume', 'éternelle', 'trompette', 'ressusciter', 'géhenne']
+}
+
+# Mots grammaticaux exclus des termes caractéristiques
+STOPWORDS = frozenset(normalize(word) for word in """
+au aux avec ce ces cet cette dans de des du elle elles en est et eux il ils je la le les leur leurs lui ma
+mais me mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sont sur ta te tes toi
+ton tu un une vos votre vous y a été être fut était sera ont avait avez ai as car si comme tout tous toute
+toutes point ni donc alors ainsi quand afin vers chez contre sans sous entre après avant celui celle ceux
+voici voila dit dis dire fait faire lorsque puis
+""".split())
+
+# Score d'un thème : occurrences pour 10 000 mots
+THEME_SCALE = 10_000
+
+
+def load_themes(path=THEMES_FILE):
+    """Lexiques thématiques normalisés (minuscules, sans accents)
+
+    Une entrée composée ('tout-puissant') reste une expression ('tout puissant') comptée comme
+    suite de mots, et non comme deux mots isolés.
+    """
+    themes = DEFAULT_THEMES
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            themes = json.load(f)
+    return {theme: sorted({' '.join(tokenize(word)) for word in words} - {''})
+            for theme, words in themes.items()}
+
+
+def encode_verses(verses):
+    """Mots d'un flux de versets : (vocabulaire local, identifiants des mots, début de chaque verset)"""
+    vocabulary, terms = {}, []
+    ids = array('I')
+    starts = array('I')
+    for verse in verses:
+        starts.append(len(ids))
+        for token in tokenize(verse.texte):
+            term_id = vocabulary.get(token)
+            if term_id is None:
+                term_id = vocabulary[token] = len(terms)
+                terms.append(token)
+            ids.append(term_id)
+    return terms, np.frombuffer(ids, dtype=np.uint32), np.frombuffer(starts, dtype=np.uint32)
+
+
+class TermFrequencyEngine:
+    """Vocabulaire encodé en entiers et comptages par livre calculés par lots"""
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.terms = []
+        self.books = []
+        self._token_ids = {}
+        self._verse_starts = {}
+        self._counts = None
+
+    def add_book(self, book, verses):
+        """Encode les mots d'un flux de versets en identifiants entiers"""
+        self.add_encoded(book, *encode_verses(verses))
+
+    def add_encoded(self, book, terms, token_ids, verse_starts):
+        """Ajoute un livre encodé avec son propre vocabulaire (voir encode_verses)"""
+        vocabulary = self.vocabulary
+        mapping = np.empty(len(terms), dtype=np.uint32)
+        for local_id, term in enumerate(terms):
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            mapping[local_id] = term_id
+        if book not in self._token_ids:
+            self.books.append(book)
+        self._token_ids[book] = mapping[token_ids] if len(token_ids) else np.empty(0, dtype=np.uint32)
+        self._verse_starts[book] = np.asarray(verse_starts, dtype=np.uint32)
+        self._counts = None
+
+    def counts(self):
+        """Matrice livres × vocabulaire des occurrences"""
+        if self._counts is None:
+            size = len(self.terms)
+            self._counts = np.vstack([
+                np.bincount(self._token_ids[book], minlength=size) for book in self.books
+            ]) if self.books else np.zeros((0, size), dtype=np.int64)
+        return self._counts
+
+    def term_frequencies(self):
+        """Fréquences relatives par livre"""
+        counts = self.counts()
+        totals = counts.sum(axis=1, keepdims=True)
+        return counts / np.maximum(totals, 1)
+
+    def inverse_document_frequencies(self):
+        """IDF lissé, les livres servant de documents"""
+        counts = self.counts()
+        document_frequency = (counts > 0).sum(axis=0)
+        return np.log((1 + len(self.books)) / (1 + document_frequency)) + 1
+
+    def tfidf(self):
+        """Matrice TF-IDF livres × vocabulaire"""
+        return self.term_frequencies() * self.inverse_document_frequencies()
+
+    def top_terms(self, book, k=5, min_length=3):
+        """Termes les plus caractéristiques d'un livre (TF-IDF), hors mots grammaticaux"""
+        scores = self.tfidf()[self.books.index(book)].copy()
+        excluded = [i for i, term in enumerate(self.terms)
+                    if term in STOPWORDS or len(term) < min_length or term.isdigit()]
+        scores[excluded] = 0
+        best = np.argsort(scores)[::-1][:k]
+        return [self.terms[i] for i in best if scores[i] > 0]
+
+    def _within_verse(self, book, n):
+        """Masque des positions où commence une suite de n mots d'un même verset"""
+        ids = self._token_ids[book]
+        verse_id = np.zeros(len(ids), dtype=np.int64)
+        starts = self._verse_starts[book]
+        verse_id[starts[(starts > 0) & (starts < len(ids))]] = 1
+        verse_id = np.cumsum(verse_id)
+        return verse_id[:len(ids) - n + 1] == verse_id[n - 1:]
+
+    def ngram_counts(self, book, n=2, k=20):
+        """N-grammes les plus fréquents d'un livre, sans franchir la limite des versets"""
+        ids = self._token_ids[book].astype(np.int64)
+        if len(ids) < n:
+            return []
+        size = max(len(self.terms), 1)
+        if size ** n >= 2 ** 63:
+            raise ValueError(f"n-grammes de longueur {n} trop longs pour un vocabulaire de {size} mots")
+        keys = np.zeros(len(ids) - n + 1, dtype=np.int64)
+        for offset in range(n):
+            keys = keys * size + ids[offset:len(ids) - n + 1 + offset]
+        # Un n-gramme qui commence dans les n-1 derniers mots d'un verset est écarté
+        keys = keys[self._within_verse(book, n)]
+        values, counts = np.unique(keys, return_counts=True)
+        best = np.argsort(counts)[::-1][:k]
+        ngrams = []
+        for key, count in zip(values[best], counts[best]):
+            words = []
+            for _ in range(n):
+                key, term_id = divmod(int(key), size)
+                words.append(self.terms[term_id])
+            ngrams.append((' '.join(reversed(words)), int(count)))
+        return ngrams
+
+    def phrase_counts(self, phrase):
+        """Occurrences par livre d'une expression ('tout puissant'), à l'intérieur d'un verset"""
+        words = phrase.split()
+        if any(word not in self.vocabulary for word in words):
+            return np.zeros(len(self.books), dtype=np.int64)
+        phrase_ids = [self.vocabulary[word] for word in words]
+        n = len(phrase_ids)
+        counts = []
+        for book in self.books:
+            ids = self._token_ids[book]
+            if len(ids) < n:
+                counts.append(0)
+                continue
+            mask = self._within_verse(book, n)
+            for offset, term_id in enumerate(phrase_ids):
+                mask &= ids[offset:len(ids) - n + 1 + offset] == term_id
+            counts.append(int(mask.sum()))
+        return np.array(counts, dtype=np.int64)
+
+    def theme_scores(self, themes):
+        """Importance relative des thèmes (%, 100 = thème le plus présent) par livre
+
+        Les mots isolés sont comptés dans le vocabulaire, les expressions comme suites de mots.
+        """
+        frequencies = self.term_frequencies()
+        totals = np.maximum(self.counts().sum(axis=1), 1)
+        scores = {}
+        for theme, words in themes.items():
+            ids = [self.vocabulary[word] for word in words if ' ' not in word and word in self.vocabulary]
+            phrases = [word for word in words if ' ' in word]
+            phrase_total = sum((self.phrase_counts(phrase) for phrase in phrases), np.zeros(len(self.books)))
+            scores[theme] = (frequencies[:, ids].sum(axis=1) + phrase_total / totals) * THEME_SCALE
+        df = pd.DataFrame(scores, index=self.books).T
+        df.index.name = 'Thème'
+        peak = df.to_numpy().max() if df.size else 0
+        return (df / peak * 100).round(1) if peak > 0 else df
+
+
+def build_engine(corpus_dir=CORPUS_DIR):
+    """Moteur alimenté par tous les livres du corpus"""
+    engine = TermFrequencyEngine()
+    for book, path in corpus_files(corpus_dir).items():
+        engine.add_book(book, iter_verses(path))
+    return engine
@@ -0,0 +1,55 @@
+# normalization.py
+"""Normalisation vectorisée des dimensions de comparaison, pour un nombre quelconque de livres"""
+import numpy as np
+import pandas as pd
+
+# Libellé affiché -> méthode
+NORMALIZATION_METHODS = {
+    'Maximum (% du plus grand)': 'max',
+    'Min-max (0 à 100)': 'minmax',
+    'Score z (écarts-types)': 'zscore',
+    'Rang (centile)': 'rank'
+}
+
+# Dimensions du radar
+RADAR_DIMENSIONS = ['Nombre de versets', 'Nombre de mots', 'Durée révélation (années)',
+                    'Nombre de langues traduit', 'Pourcentage monde influencé']
+
+
+def normalize(df, dimensions, method='max', index='Livre'):
+    """Normalise toutes les colonnes `dimensions` en une opération ; une ligne par livre
+
+    max : valeur / maximum × 100 ; minmax : 0 à 100 entre minimum et maximum ;
+    zscore : écart à la moyenne en écarts-types ; rank : rang centile (0 à 100].
+    Une colonne constante vaut 100 (max, minmax, rank) ou 0 (zscore).
+    """
+    values = df[dimensions].to_numpy(dtype=np.float64)
+
+    if method == 'rank':
+        # Rang moyen des ex æquo, comme DataFrame.rank(pct=True)
+        result = df[dimensions].rank(pct=True).to_numpy() * 100
+    elif method == 'zscore':
+        std = values.std(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(std > 0, (values - values.mean(axis=0)) / std, 0.0)
+    elif method == 'minmax':
+        low = values.min(axis=0)
+        span = values.max(axis=0) - low
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(span > 0, (values - low) / span * 100, 100.0)
+    elif method == 'max':
+        high = values.max(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(high != 0, values / high * 100, 100.0)
+    else:
+        raise ValueError(f"Méthode de normalisation inconnue : {method}")
+
+    return pd.DataFrame(result, index=pd.Index(df[index].to_numpy(), name=index), columns=dimensions)
+
+
+def radial_range(normalized, method):
+    """Étendue de l'axe radial adaptée à la méthode"""
+    if method != 'zscore':
+        return [0, 100]
+    bound = float(np.ceil(np.abs(normalized.to_numpy()).max())) if normalized.size else 1.0
+    return [-max(bound, 1.0), max(bound, 1.0)]
@@ -0,0 +1,335 @@
+# parallels.py
+"""Passages parallèles entre livres : signatures MinHash des versets et hachage LSH par bandes"""
+import argparse
+import json
+import os
+import shutil
+import time
+import zlib
+
+import numpy as np
+
+from corpus import CORPUS_DIR, corpus_files, iter_verses, tokenize
+from frequencies import STOPWORDS
+from verse_store import VerseWriter, artifact_verses, shared_path
+
+PARALLELS_DIR = os.environ.get(
+    "SACREMENT_PARALLELS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "parallels")
+)
+REGISTRY_FILE = "livres.json"
+
+# Fichiers d'un livre (textes et références : magasin des versets du livre, verse_store.py)
+SIGNATURES_FILE = "signatures.npy"
+META_FILE = "meta.json"
+
+# Tables LSH (une ligne par bande, triées) et paires précalculées
+LSH_KEYS_FILE = "lsh_cles.npy"
+LSH_IDS_FILE = "lsh_versets.npy"
+PAIRS_FILE = "paires.npy"
+
+# 128 permutations en 32 bandes de 4 lignes : une paire de similarité de Jaccard s
+# devient candidate avec une probabilité 1 - (1 - s^4)^32 (50 % vers s = 0,42)
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SEED = 1
+
+# Seuil de similarité estimée retenu, mots distincts minimum d'un verset, taille max d'un seau LSH
+MIN_SIMILARITY = 0.5
+MIN_TOKENS = 3
+MAX_BUCKET = 50
+
+# Nombre de mots traités par bloc lors du calcul des signatures
+BLOCK_TOKENS = 1 << 16
+
+EMPTY = np.iinfo(np.uint32).max
+PAIR_DTYPE = np.dtype([('a', np.uint32), ('b', np.uint32), ('similarite', np.float32)])
+
+
+def _permutations(num_perm=NUM_PERM, seed=SEED):
+    """Coefficients des fonctions de hachage multiplication-décalage (a impair)"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+PERM_A, PERM_B = _permutations()
+
+
+def shingles(text):
+    """Mots pleins distincts d'un verset"""
+    return {token for token in tokenize(text) if token not in STOPWORDS}
+
+
+def _hash_tokens(tokens):
+    """Empreintes 32 bits stables (indépendantes de PYTHONHASHSEED)"""
+    return np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens),
+                       dtype=np.uint64, count=len(tokens))
+
+
+def signatures(token_sets):
+    """Signatures MinHash (versets × NUM_PERM) ; ligne EMPTY pour les versets trop courts"""
+    result = np.full((len(token_sets), NUM_PERM), EMPTY, dtype=np.uint32)
+    rows = [row for row, tokens in enumerate(token_sets) if len(tokens) >= MIN_TOKENS]
+
+    start = 0
+    while start < len(rows):
+        # Bloc de versets dont les mots tiennent en BLOCK_TOKENS colonnes
+        stop, size = start, 0
+        while stop < len(rows) and (stop == start or size + len(token_sets[rows[stop]]) <= BLOCK_TOKENS):
+            size += len(token_sets[rows[stop]])
+            stop += 1
+        block = rows[start:stop]
+        hashes = _hash_tokens([token for row in block for token in token_sets[row]])
+        bounds = np.cumsum([0] + [len(token_sets[row]) for row in block[:-1]])
+        # h(x) = (a·x + b) mod 2^64 >> 32, puis minimum par verset
+        permuted = ((PERM_A * hashes + PERM_B) >> np.uint64(32)).astype(np.uint32)
+        result[block] = np.minimum.reduceat(permuted, bounds, axis=1).T
+        start = stop
+    return result
+
+
+def band_keys(sigs):
+    """Clé 64 bits de chaque bande (versets × BANDS)"""
+    keys = np.zeros((len(sigs), BANDS), dtype=np.uint64)
+    banded = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    for row in range(ROWS):
+        keys = keys * np.uint64(0x9E3779B97F4A7C15) + banded[:, :, row]
+    return keys
+
+
+def similarity(sigs_a, sigs_b):
+    """Similarité de Jaccard estimée, ligne à ligne"""
+    return (np.asarray(sigs_a) == np.asarray(sigs_b)).mean(axis=1)
+
+
+def build_book(parallels_dir, book, verses, verses_dir=None):
+    """Signatures des versets d'un livre ; textes et références lus dans `verses_dir` (magasin
+    construit à partir du même flux) ou, à défaut, embarqués"""
+    target = os.path.join(parallels_dir, book)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    writer = None if verses_dir else VerseWriter(tmp)
+    token_sets = []
+    for verse in verses:
+        if writer is not None:
+            writer.add(verse)
+        token_sets.append(sorted(shingles(verse.texte)))
+    if writer is not None:
+        writer.close()
+
+    np.save(os.path.join(tmp, SIGNATURES_FILE), signatures(token_sets))
+    with open(os.path.join(tmp, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'livre': book, 'versets': len(token_sets), 'permutations': NUM_PERM, 'graine': SEED,
+                   'magasin': shared_path(target, verses_dir) if verses_dir else None},
+                  f, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+
+def _candidate_pairs(keys, book_of):
+    """Paires (a < b) de versets de livres différents partageant un seau dans au moins une bande"""
+    found = []
+    for band in range(keys.shape[0]):
+        order = np.argsort(keys[band], kind='stable')
+        sorted_keys = keys[band][order]
+        # Numéro de seau de chaque position ; les seaux trop grands (versets banals) sont ignorés
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(sorted_keys)])
+        bucket = np.repeat(np.arange(len(starts)), sizes)
+        valid = np.repeat((sizes > 1) & (sizes <= MAX_BUCKET), sizes)
+        for shift in range(1, min(MAX_BUCKET, len(order))):
+            same = valid[:-shift] & (bucket[:-shift] == bucket[shift:])
+            if not same.any():
+                break
+            a, b = order[:-shift][same], order[shift:][same]
+            cross = book_of[a] != book_of[b]
+            a, b = a[cross], b[cross]
+            found.append((np.minimum(a, b).astype(np.uint64) << np.uint64(32)) | np.maximum(a, b).astype(np.uint64))
+    if not found:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32)
+    pairs = np.unique(np.concatenate(found))
+    return (pairs >> np.uint64(32)).astype(np.uint32), (pairs & np.uint64(EMPTY)).astype(np.uint32)
+
+
+def build_tables(parallels_dir, books, min_similarity=MIN_SIMILARITY):
+    """Tables LSH de tous les livres et paires parallèles précalculées"""
+    per_book = [np.load(os.path.join(parallels_dir, book, SIGNATURES_FILE)) for book in books]
+    sigs = np.concatenate(per_book) if per_book else np.empty((0, NUM_PERM), dtype=np.uint32)
+    counts = [len(book_sigs) for book_sigs in per_book]
+    book_of = np.repeat(np.arange(len(books)), counts)
+
+    # Les versets trop courts n'entrent pas dans les tables
+    indexed = np.flatnonzero(sigs[:, 0] != EMPTY).astype(np.uint32)
+    keys = band_keys(sigs[indexed]).T
+    order = np.argsort(keys, axis=1, kind='stable')
+    np.save(os.path.join(parallels_dir, LSH_KEYS_FILE), np.take_along_axis(keys, order, axis=1))
+    np.save(os.path.join(parallels_dir, LSH_IDS_FILE), indexed[order])
+
+    a, b = _candidate_pairs(keys, book_of[indexed])
+    a, b = indexed[a], indexed[b]
+    scores = np.concatenate([similarity(sigs[a[i:i + 100_000]], sigs[b[i:i + 100_000]])
+                             for i in range(0, len(a), 100_000)]) if len(a) else np.empty(0)
+    keep = scores >= min_similarity
+    pairs = np.empty(int(keep.sum()), dtype=PAIR_DTYPE)
+    pairs['a'], pairs['b'], pairs['similarite'] = a[keep], b[keep], scores[keep]
+    pairs = pairs[np.argsort(-pairs['similarite'], kind='stable')]
+    np.save(os.path.join(parallels_dir, PAIRS_FILE), pairs)
+
+    path = os.path.join(parallels_dir, REGISTRY_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({'livres': list(books), 'versets': counts}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+    return len(pairs)
+
+
+def build_parallels(corpus_dir=CORPUS_DIR, parallels_dir=PARALLELS_DIR):
+    """Signatures de chaque livre du corpus, puis tables LSH et paires"""
+    os.makedirs(parallels_dir, exist_ok=True)
+    books = corpus_files(corpus_dir)
+    for book, path in books.items():
+        build_book(parallels_dir, book, iter_verses(path))
+    return build_tables(parallels_dir, list(books))
+
+
+class BookSignatures:
+    """Signatures et versets d'un livre, mappés en mémoire"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.book = meta['livre']
+        self.signatures = np.load(os.path.join(directory, SIGNATURES_FILE), mmap_mode='r')
+        self.verses = artifact_verses(directory, meta.get('magasin'))
+        if self.verses.size != len(self.signatures):
+            raise ValueError(f"Signatures {directory} désynchronisées de leur magasin des versets")
+
+    def reference(self, doc):
+        livre, chapter, verse = self.verses.reference(doc)
+        return f"{livre} {chapter}:{verse}"
+
+    def verse_text(self, doc):
+        return self.verses.verse_text(doc)
+
+
+class ParallelIndex:
+    """Requêtes sur les passages parallèles : paires précalculées et recherche LSH d'un texte"""
+
+    def __init__(self, parallels_dir=PARALLELS_DIR):
+        with open(os.path.join(parallels_dir, REGISTRY_FILE), encoding='utf-8') as f:
+            registry = json.load(f)
+        self.books = registry['livres']
+        self.signatures = [BookSignatures(os.path.join(parallels_dir, book)) for book in self.books]
+        self.starts = np.cumsum([0] + registry['versets'])
+        self.keys = np.load(os.path.join(parallels_dir, LSH_KEYS_FILE), mmap_mode='r')
+        self.ids = np.load(os.path.join(parallels_dir, LSH_IDS_FILE), mmap_mode='r')
+        self.pairs = np.load(os.path.join(parallels_dir, PAIRS_FILE))
+        book_of = np.searchsorted(self.starts, np.arange(self.starts[-1]), side='right') - 1
+        self.pair_books = (book_of[self.pairs['a']], book_of[self.pairs['b']])
+
+    def locate(self, verse_id):
+        """(signatures du livre, numéro du verset dans le livre)"""
+        book = int(np.searchsorted(self.starts, verse_id, side='right')) - 1
+        return self.signatures[book], int(verse_id - self.starts[book])
+
+    def signature(self, verse_id):
+        book, doc = self.locate(verse_id)
+        return book.signatures[doc]
+
+    def _row(self, verse_id, suffix=''):
+        book, doc = self.locate(verse_id)
+        return {f'Livre{suffix}': book.book, f'Référence{suffix}': book.reference(doc),
+                f'Texte{suffix}': book.verse_text(doc)}
+
+    def counts(self, books=None):
+        """Nombre de paires parallèles par couple de livres"""
+        low = np.minimum(*self.pair_books)
+        high = np.maximum(*self.pair_books)
+        couples, counts = np.unique(low * len(self.books) + high, return_counts=True)
+        result = {}
+        for couple, count in zip(couples.tolist(), counts.tolist()):
+            key = (self.books[couple // len(self.books)], self.books[couple % len(self.books)])
+            if books is None or (key[0] in books and key[1] in books):
+                result[key] = count
+        return result
+
+    def parallel_pairs(self, books=None, min_similarity=MIN_SIMILARITY, limit=100):
+        """Paires précalculées entre les livres `books`, des plus semblables aux moins semblables"""
+        keep = self.pairs['similarite'] >= min_similarity
+        if books is not None:
+            selected = np.zeros(len(self.books), dtype=bool)
+            selected[[i for i, book in enumerate(self.books) if book in books]] = True
+            keep &= selected[self.pair_books[0]] & selected[self.pair_books[1]]
+        matched = self.pairs[keep]
+        rows = [dict(**self._row(int(pair['a']), ' A'), **self._row(int(pair['b']), ' B'),
+                     Similarité=round(float(pair['similarite']), 2))
+                for pair in matched[:limit]]
+        return len(matched), rows
+
+    def similar(self, text, books=None, min_similarity=MIN_SIMILARITY, limit=20):
+        """Versets proches d'un passage libre, trouvés par les seaux LSH (sans comparaison exhaustive)"""
+        tokens = sorted(shingles(text))
+        if len(tokens) < MIN_TOKENS:
+            return []
+        signature = signatures([tokens])[0]
+        keys = band_keys(signature[None, :])[0]
+        candidates = []
+        for band, key in enumerate(keys):
+            low = np.searchsorted(self.keys[band], key, side='left')
+            high = np.searchsorted(self.keys[band], key, side='right')
+            candidates.append(self.ids[band][low:high])
+        candidates = np.unique(np.concatenate(candidates)) if candidates else np.empty(0, dtype=np.uint32)
+
+        rows = []
+        for verse_id in candidates.tolist():
+            book, doc = self.locate(verse_id)
+            if books is not None and book.book not in books:
+                continue
+            score = float((book.signatures[doc] == signature).mean())
+            if score >= min_similarity:
+                rows.append(dict(**self._row(verse_id), Similarité=round(score, 2)))
+        rows.sort(key=lambda row: -row['Similarité'])
+        return rows[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Passages parallèles entre livres (MinHash / LSH)")
+    parser.add_argument('--dir', default=PARALLELS_DIR, help="Répertoire des signatures")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Calcule les signatures et les paires du corpus")
+    build.add_argument('--corpus', default=CORPUS_DIR)
+    pairs = commands.add_parser('pairs', help="Affiche les paires parallèles")
+    pairs.add_argument('--livre', action='append')
+    pairs.add_argument('--seuil', type=float, default=MIN_SIMILARITY)
+    similar = commands.add_parser('similar', help="Cherche les versets proches d'un passage")
+    similar.add_argument('text')
+    similar.add_argument('--seuil', type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        count = build_parallels(args.corpus, args.dir)
+        print(f"{count} paire(s) parallèle(s) en {time.perf_counter() - start:.1f} s")
+        return
+
+    index = ParallelIndex(args.dir)
+    start = time.perf_counter()
+    if args.command == 'pairs':
+        total, rows = index.parallel_pairs(args.livre, args.seuil)
+    else:
+        rows = index.similar(args.text, min_similarity=args.seuil)
+        total = len(rows)
+    elapsed = (time.perf_counter() - start) * 1000
+    for row in rows:
+        print(" | ".join(f"{key} : {value}" for key, value in row.items()))
+    print(f"{total} résultat(s) en {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
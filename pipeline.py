@@ -0,0 +1,326 @@
+# pipeline.py
+"""Recalcul incrémental des données dérivées du corpus, piloté par un manifeste d'empreintes
+
+    python pipeline.py build    # avant déploiement : ne recalcule que les artefacts périmés
+    python pipeline.py status   # artefacts à jour / périmés
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus import CORPUS_DIR, STATS_WORKERS, compute_book_stats, corpus_files, iter_verses
+from frequencies import TermFrequencyEngine, encode_verses
+from parallels import NUM_PERM, PARALLELS_DIR, REGISTRY_FILE, SEED, build_book, build_tables
+from search_index import INDEX_DIR, SEGMENTS_FILE, build_segment, read_segment_names, write_segment_names
+from verse_store import VerseStore, build_store
+
+# Statistiques et comptages persistés, et manifeste des empreintes
+DERIVED_DIR = os.environ.get(
+    "SACREMENT_DERIVED_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "derived")
+)
+MANIFEST_FILE = "manifest.json"
+
+# Version du calcul de chaque artefact par livre : la changer force sa reconstruction
+BOOK_ARTIFACTS = {
+    'statistiques': '2',
+    'frequences': '1',
+    'versets': '1',
+    'index': '3',
+    'minhash': f"3-{NUM_PERM}-{SEED}"
+}
+# Artefacts qui lisent le magasin des versets du livre : construits après lui
+VERSE_READERS = ('index', 'minhash')
+# Artefacts calculés à partir de ceux de tous les livres (clé corpus/<nom>)
+CORPUS_ARTIFACTS = {
+    'index': ('index', '1'),
+    'minhash': ('paralleles', '1')
+}
+
+_lock = threading.Lock()
+
+
+def file_digest(path):
+    """SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+class Manifest:
+    """Empreintes des sources et entrées de chaque artefact lors de sa dernière construction"""
+
+    def __init__(self, derived_dir=DERIVED_DIR):
+        self.path = os.path.join(derived_dir, MANIFEST_FILE)
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        self.sources = data.get('sources', {})
+        self.artifacts = data.get('artefacts', {})
+        self._saved = self._content()
+
+    def _content(self):
+        return json.dumps({'sources': self.sources, 'artefacts': self.artifacts}, sort_keys=True)
+
+    def source_digest(self, book, path):
+        """Empreinte d'un fichier source (recalculée seulement si sa taille ou sa date change)"""
+        stat = os.stat(path)
+        entry = self.sources.get(book)
+        if entry is None or (entry['chemin'], entry['taille'], entry['mtime_ns']) != (path, stat.st_size, stat.st_mtime_ns):
+            entry = {'chemin': path, 'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                     'sha256': file_digest(path)}
+            self.sources[book] = entry
+        return entry['sha256']
+
+    def is_fresh(self, key, inputs, version, output):
+        """L'artefact existe et a été construit avec ces entrées et cette version du calcul"""
+        entry = self.artifacts.get(key)
+        return (entry is not None and entry['entrees'] == inputs and entry['version'] == version
+                and os.path.exists(output))
+
+    def record(self, key, inputs, version, output):
+        self.artifacts[key] = {'entrees': inputs, 'version': version, 'sortie': output,
+                               'horodatage': time.time()}
+
+    def save(self):
+        """Écrit le manifeste s'il a changé depuis sa lecture"""
+        content = self._content()
+        if content != self._saved:
+            _write_json(self.path, {'sources': self.sources, 'artefacts': self.artifacts})
+            self._saved = content
+
+
+def artifact_path(kind, book, derived_dir=DERIVED_DIR, index_dir=INDEX_DIR, parallels_dir=PARALLELS_DIR):
+    """Emplacement d'un artefact d'un livre"""
+    if kind == 'statistiques':
+        return os.path.join(derived_dir, 'statistiques', f"{book}.json")
+    if kind == 'frequences':
+        return os.path.join(derived_dir, 'frequences', f"{book}.npz")
+    if kind == 'versets':
+        return os.path.join(derived_dir, 'versets', book)
+    if kind == 'index':
+        return os.path.join(index_dir, book)
+    return os.path.join(parallels_dir, book)
+
+
+def _build_frequencies(output, path):
+    terms, token_ids, verse_starts = encode_verses(iter_verses(path))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp = output[:-len('.npz')] + ".tmp.npz"
+    np.savez(tmp, termes=np.array(terms, dtype=np.str_), ids=token_ids, debuts=verse_starts)
+    os.replace(tmp, output)
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def corpus_inputs(kind, digests):
+    """Entrées d'un artefact global : version de l'artefact par livre et empreintes de tous les livres"""
+    return hashlib.sha256(json.dumps([BOOK_ARTIFACTS[kind], digests], sort_keys=True).encode()).hexdigest()
+
+
+def corpus_output(kind, index_dir=INDEX_DIR, parallels_dir=PARALLELS_DIR):
+    """Fichier d'un artefact global (registre des segments, registre des parallèles)"""
+    if kind == 'index':
+        return os.path.join(index_dir, SEGMENTS_FILE)
+    return os.path.join(parallels_dir, REGISTRY_FILE)
+
+
+def update(corpus_dir=CORPUS_DIR, kinds=None, workers=STATS_WORKERS, force=False,
+           derived_dir=DERIVED_DIR, index_dir=INDEX_DIR, parallels_dir=PARALLELS_DIR):
+    """Reconstruit les artefacts périmés (`kinds` : tous par défaut) ; retourne les clés reconstruites"""
+    kinds = list(BOOK_ARTIFACTS) if kinds is None else list(kinds)
+    if any(kind in VERSE_READERS for kind in kinds):
+        kinds = [kind for kind in BOOK_ARTIFACTS if kind in kinds or kind == 'versets']
+    dirs = dict(derived_dir=derived_dir, index_dir=index_dir, parallels_dir=parallels_dir)
+    with _lock:
+        manifest = Manifest(derived_dir)
+        files = corpus_files(corpus_dir)
+        digests = {book: manifest.source_digest(book, path) for book, path in files.items()}
+        manifest.sources = {book: manifest.sources[book] for book in files}
+        indexed = {key.split('/', 1)[1] for key in manifest.artifacts if key.startswith('index/')}
+        rebuilt = []
+
+        # Livres retirés du corpus : leurs artefacts disparaissent
+        for key in list(manifest.artifacts):
+            kind, book = key.split('/', 1)
+            if kind in kinds and book not in files:
+                _remove(artifact_path(kind, book, **dirs))
+                del manifest.artifacts[key]
+
+        executor = None
+        try:
+            for kind in kinds:
+                version = BOOK_ARTIFACTS[kind]
+                for book, path in files.items():
+                    key, output = f"{kind}/{book}", artifact_path(kind, book, **dirs)
+                    if not force and manifest.is_fresh(key, digests[book], version, output):
+                        continue
+                    if kind == 'statistiques':
+                        if executor is None and workers > 1:
+                            executor = ProcessPoolExecutor(max_workers=workers)
+                        stats = compute_book_stats(path, executor, max_pending=2 * workers).as_dict()
+                        _write_json(output, stats)
+                    elif kind == 'frequences':
+                        _build_frequencies(output, path)
+                    elif kind == 'versets':
+                        os.makedirs(os.path.dirname(output), exist_ok=True)
+                        build_store(os.path.dirname(output), book, iter_verses(path))
+                    elif kind == 'index':
+                        os.makedirs(index_dir, exist_ok=True)
+                        build_segment(index_dir, book, book, iter_verses(path),
+                                      artifact_path('versets', book, **dirs))
+                    else:
+                        os.makedirs(parallels_dir, exist_ok=True)
+                        build_book(parallels_dir, book, iter_verses(path), artifact_path('versets', book, **dirs))
+                    manifest.record(key, digests[book], version, output)
+                    rebuilt.append(key)
+
+                if kind not in CORPUS_ARTIFACTS:
+                    continue
+                # Artefact global : dépend des empreintes de tous les livres
+                name, version = CORPUS_ARTIFACTS[kind]
+                key = f"corpus/{name}"
+                inputs = corpus_inputs(kind, digests)
+                output = corpus_output(kind, index_dir, parallels_dir)
+                if kind == 'index':
+                    if force or not manifest.is_fresh(key, inputs, version, output):
+                        # Les traductions ajoutées à la main (search_index.py add) sont conservées
+                        extra = [segment for segment in read_segment_names(index_dir)
+                                 if segment not in files and segment not in indexed]
+                        write_segment_names(index_dir, list(files) + extra)
+                        manifest.record(key, inputs, version, output)
+                        rebuilt.append(key)
+                else:
+                    if force or not manifest.is_fresh(key, inputs, version, output):
+                        build_tables(parallels_dir, list(files))
+                        manifest.record(key, inputs, version, output)
+                        rebuilt.append(key)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        manifest.save()
+    return rebuilt
+
+
+def load_corpus_stats(corpus_dir=CORPUS_DIR, derived_dir=DERIVED_DIR, **kwargs):
+    """Statistiques par livre, relues depuis les artefacts (recalculées seulement si périmées)"""
+    files = corpus_files(corpus_dir)
+    if not files:
+        return {}
+    update(corpus_dir, ['statistiques'], derived_dir=derived_dir, **kwargs)
+    stats = {}
+    for book in files:
+        with open(artifact_path('statistiques', book, derived_dir), encoding='utf-8') as f:
+            stats[book] = json.load(f)
+    return stats
+
+
+def load_engine(corpus_dir=CORPUS_DIR, derived_dir=DERIVED_DIR, **kwargs):
+    """Moteur de fréquences alimenté par les comptages persistés de chaque livre"""
+    files = corpus_files(corpus_dir)
+    update(corpus_dir, ['frequences'], derived_dir=derived_dir, **kwargs)
+    engine = TermFrequencyEngine()
+    for book in files:
+        with np.load(artifact_path('frequences', book, derived_dir)) as data:
+            engine.add_encoded(book, data['termes'].tolist(), data['ids'], data['debuts'])
+    return engine
+
+
+def load_verse_store(corpus_dir=CORPUS_DIR, derived_dir=DERIVED_DIR, **kwargs):
+    """Magasin des versets de chaque livre du corpus (reconstruit seulement si périmé)"""
+    files = corpus_files(corpus_dir)
+    update(corpus_dir, ['versets'], derived_dir=derived_dir, **kwargs)
+    return VerseStore(os.path.join(derived_dir, 'versets'), list(files))
+
+
+def load_word_counts(corpus_dir=CORPUS_DIR, derived_dir=DERIVED_DIR, **kwargs):
+    """Nombre de mots de chaque verset, par livre, relu depuis les comptages persistés"""
+    files = corpus_files(corpus_dir)
+    update(corpus_dir, ['frequences'], derived_dir=derived_dir, **kwargs)
+    counts = {}
+    for book in files:
+        with np.load(artifact_path('frequences', book, derived_dir)) as data:
+            starts = data['debuts'].astype(np.int64)
+            counts[book] = np.diff(np.append(starts, len(data['ids'])))
+    return counts
+
+
+def status(corpus_dir=CORPUS_DIR, derived_dir=DERIVED_DIR, index_dir=INDEX_DIR, parallels_dir=PARALLELS_DIR,
+           kinds=None):
+    """État de chaque artefact (par livre, puis global) : 'à jour' ou 'périmé'"""
+    kinds = list(BOOK_ARTIFACTS) if kinds is None else list(kinds)
+    manifest = Manifest(derived_dir)
+    dirs = dict(derived_dir=derived_dir, index_dir=index_dir, parallels_dir=parallels_dir)
+    digests = {book: manifest.source_digest(book, path) for book, path in corpus_files(corpus_dir).items()}
+    states = {}
+    for kind in kinds:
+        for book, digest in digests.items():
+            fresh = manifest.is_fresh(f"{kind}/{book}", digest, BOOK_ARTIFACTS[kind], artifact_path(kind, book, **dirs))
+            states[f"{kind}/{book}"] = 'à jour' if fresh else 'périmé'
+    for kind in kinds:
+        if kind not in CORPUS_ARTIFACTS or not digests:
+            continue
+        name, version = CORPUS_ARTIFACTS[kind]
+        fresh = manifest.is_fresh(f"corpus/{name}", corpus_inputs(kind, digests), version,
+                                  corpus_output(kind, index_dir, parallels_dir))
+        states[f"corpus/{name}"] = 'à jour' if fresh else 'périmé'
+    return states
+
+
+def is_stale(kinds, **kwargs):
+    """Au moins un artefact de ces types est à reconstruire"""
+    return 'périmé' in status(kinds=kinds, **kwargs).values()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construction incrémentale des données dérivées du corpus")
+    parser.add_argument('--corpus', default=CORPUS_DIR)
+    parser.add_argument('--derived', default=DERIVED_DIR)
+    parser.add_argument('--index', default=INDEX_DIR)
+    parser.add_argument('--parallels', default=PARALLELS_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Reconstruit les artefacts périmés")
+    build.add_argument('--artefact', action='append', choices=list(BOOK_ARTIFACTS),
+                       help="Limite la construction à ce type d'artefact (répétable)")
+    build.add_argument('--workers', type=int, default=STATS_WORKERS)
+    build.add_argument('--force', action='store_true', help="Reconstruit tout")
+    commands.add_parser('status', help="Affiche les artefacts périmés")
+    args = parser.parse_args(argv)
+
+    dirs = dict(derived_dir=args.derived, index_dir=args.index, parallels_dir=args.parallels)
+    if args.command == 'build':
+        start = time.perf_counter()
+        rebuilt = update(args.corpus, args.artefact, args.workers, args.force, **dirs)
+        for key in rebuilt:
+            print(f"reconstruit : {key}")
+        print(f"{len(rebuilt)} artefact(s) reconstruit(s) en {time.perf_counter() - start:.1f} s")
+    else:
+        for key, state in status(args.corpus, **dirs).items():
+            print(f"{state:<8} {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# profiling.py
+"""Instrumentation des sections du dashboard : temps, taille des figures et mémoire par rerun"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+
+PROFILING_ENABLED = os.environ.get("SACREMENT_PROFILING", "0") == "1"
+
+# Exports pour les collecteurs (chemins vides : pas d'export fichier)
+METRICS_PROMETHEUS_FILE = os.environ.get("SACREMENT_METRICS_FILE", "")
+METRICS_JSONL_FILE = os.environ.get("SACREMENT_METRICS_JSONL", "")
+
+# tracemalloc est global au processus : suivi actif tant qu'au moins un profileur le demande
+# (les sessions expirées sortent d'elles-mêmes de l'ensemble)
+_memory_lock = threading.Lock()
+_memory_users = weakref.WeakSet()
+
+
+def _track_memory(profiler, enabled):
+    """Inscrit ou retire un profileur du suivi mémoire ; démarre ou arrête tracemalloc aux passages 0 <-> 1"""
+    with _memory_lock:
+        if enabled:
+            _memory_users.add(profiler)
+        else:
+            _memory_users.discard(profiler)
+        if _memory_users and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _memory_users and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Profiler:
+    """Mesures du rerun en cours d'une session
+
+    La variation mémoire d'une section est celle du processus : elle inclut les allocations des
+    autres sessions servies en même temps.
+    """
+
+    def __init__(self, enabled=PROFILING_ENABLED):
+        self.enabled = enabled
+        self.records = []
+        self._stack = []
+
+    def start_run(self):
+        """Commence un nouveau rerun"""
+        self.records = []
+        self._stack = []
+        if self.enabled:
+            _track_memory(self, True)
+
+    def set_enabled(self, enabled):
+        """Active ou désactive le profilage (et sa part du suivi mémoire, coûteux)"""
+        if enabled and not self.enabled:
+            self.enabled = True
+            self.start_run()
+        elif not enabled and self.enabled:
+            self.enabled = False
+            _track_memory(self, False)
+
+    @contextmanager
+    def section(self, name):
+        """Mesure le temps, la mémoire et les octets de figures d'un bloc"""
+        record = {'section': name, 'secondes': 0.0, 'octets_figures': 0, 'memoire_delta': 0}
+        self._stack.append(record)
+        memory_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['secondes'] = time.perf_counter() - start
+            if tracemalloc.is_tracing():
+                record['memoire_delta'] = tracemalloc.get_traced_memory()[0] - memory_before
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['octets_figures'] += record['octets_figures']
+            self.records.append(record)
+
+    def add_payload(self, nbytes):
+        """Attribue la taille d'une figure envoyée au navigateur à la section en cours"""
+        if self._stack:
+            self._stack[-1]['octets_figures'] += nbytes
+
+
+def profiled(method):
+    """Décorateur de méthode du dashboard : mesure l'appel si `self.profiler` est actif"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return method(self, *args, **kwargs)
+        with profiler.section(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class MetricsRegistry:
+    """Agrégats de tous les reruns du processus, exportables pour les collecteurs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.payloads = defaultdict(int)
+        self.memory = {}
+        self.reruns = 0
+
+    def record_run(self, records):
+        """Ajoute les mesures d'un rerun"""
+        with self._lock:
+            self.reruns += 1
+            for record in records:
+                name = record['section']
+                self.durations[name] += record['secondes']
+                self.counts[name] += 1
+                self.payloads[name] += record['octets_figures']
+                self.memory[name] = record['memoire_delta']
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus"""
+        with self._lock:
+            lines = [
+                "# HELP sacrement_reruns_total Reruns profilés",
+                "# TYPE sacrement_reruns_total counter",
+                f"sacrement_reruns_total {self.reruns}",
+                "# HELP sacrement_section_duration_seconds Temps de rendu par section",
+                "# TYPE sacrement_section_duration_seconds summary"
+            ]
+            for name in sorted(self.durations):
+                lines.append(f'sacrement_section_duration_seconds_sum{{section="{name}"}} {self.durations[name]:.6f}')
+                lines.append(f'sacrement_section_duration_seconds_count{{section="{name}"}} {self.counts[name]}')
+            lines += [
+                "# HELP sacrement_section_payload_bytes_total Octets de figures envoyés par section",
+                "# TYPE sacrement_section_payload_bytes_total counter"
+            ]
+            lines += [f'sacrement_section_payload_bytes_total{{section="{name}"}} {self.payloads[name]}'
+                      for name in sorted(self.payloads)]
+            lines += [
+                "# HELP sacrement_section_memory_delta_bytes Variation mémoire lors du dernier rendu",
+                "# TYPE sacrement_section_memory_delta_bytes gauge"
+            ]
+            lines += [f'sacrement_section_memory_delta_bytes{{section="{name}"}} {self.memory[name]}'
+                      for name in sorted(self.memory)]
+        return "\n".join(lines) + "\n"
+
+    def export(self, records, prometheus_path=METRICS_PROMETHEUS_FILE, jsonl_path=METRICS_JSONL_FILE):
+        """Écrit l'exposition Prometheus et ajoute le rerun au fichier JSON lines"""
+        if prometheus_path:
+            with open(prometheus_path + ".tmp", 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(prometheus_path + ".tmp", prometheus_path)
+        if jsonl_path:
+            with self._lock, open(jsonl_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'horodatage': time.time(), 'sections': records},
+                                   ensure_ascii=False) + "\n")
@@ -0,0 +1,325 @@
+# search_index.py
+"""Index inversé persistant (listes de postings en tableaux, fichiers mappés en mémoire)"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+from corpus import CORPUS_DIR, corpus_files, iter_verses, token_spans, tokenize
+from verse_store import VerseWriter, artifact_verses, map_array, shared_path
+
+INDEX_DIR = os.environ.get(
+    "SACREMENT_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "index")
+)
+SEGMENTS_FILE = "segments.json"
+
+# Fichiers d'un segment : postings (document, position) triés par terme puis document ;
+# les textes et références sont lus dans le magasin des versets du livre (verse_store.py),
+# ou dans une copie embarquée pour une traduction ajoutée à la main
+DOCS_FILE = "postings_docs.bin"
+POSITIONS_FILE = "postings_positions.bin"
+META_FILE = "meta.json"
+
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Concordance : mots de contexte de part et d'autre, occurrences par lot diffusé
+CONTEXT_WORDS = 6
+CONCORDANCE_BATCH = 250
+
+
+def _unique_sorted(values):
+    """Valeurs distinctes d'un tableau déjà trié"""
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def build_segment(index_dir, name, book, verses, verses_dir=None):
+    """Indexe un flux de versets dans un nouveau segment (une traduction d'un livre)
+
+    Avec `verses_dir`, magasin des versets construit à partir du même flux, le segment y lit
+    textes et références ; sinon il embarque sa propre copie.
+    """
+    target = os.path.join(index_dir, name)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    postings = defaultdict(lambda: (array('I'), array('H')))
+    writer = None if verses_dir else VerseWriter(tmp)
+    size = 0
+    for doc, verse in enumerate(verses):
+        if writer is not None:
+            writer.add(verse)
+        for position, term in enumerate(tokenize(verse.texte)):
+            docs, positions = postings[term]
+            docs.append(doc)
+            positions.append(position)
+        size = doc + 1
+    if writer is not None:
+        writer.close()
+
+    terms = {}
+    start = 0
+    with open(os.path.join(tmp, DOCS_FILE), 'wb') as docs_file, \
+            open(os.path.join(tmp, POSITIONS_FILE), 'wb') as positions_file:
+        for term in sorted(postings):
+            docs, positions = postings[term]
+            docs.tofile(docs_file)
+            positions.tofile(positions_file)
+            terms[term] = (start, len(docs))
+            start += len(docs)
+
+    with open(os.path.join(tmp, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'livre': book,
+            'documents': size,
+            'byteorder': sys.byteorder,
+            'magasin': shared_path(target, verses_dir) if verses_dir else None,
+            'termes': terms
+        }, f, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+
+def read_segment_names(index_dir):
+    """Segments enregistrés dans l'index"""
+    try:
+        with open(os.path.join(index_dir, SEGMENTS_FILE), encoding='utf-8') as f:
+            return json.load(f)['segments']
+    except FileNotFoundError:
+        return []
+
+
+def write_segment_names(index_dir, names):
+    """Enregistre la liste des segments (remplacement atomique)"""
+    path = os.path.join(index_dir, SEGMENTS_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({'segments': names}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def add_translation(index_dir, name, book, path):
+    """Ajoute (ou remplace) un segment sans reconstruire les autres"""
+    os.makedirs(index_dir, exist_ok=True)
+    build_segment(index_dir, name, book, iter_verses(path))
+    names = read_segment_names(index_dir)
+    if name not in names:
+        write_segment_names(index_dir, names + [name])
+
+
+def build_index(corpus_dir=CORPUS_DIR, index_dir=INDEX_DIR):
+    """Construit un segment par fichier du corpus"""
+    os.makedirs(index_dir, exist_ok=True)
+    names = []
+    for book, path in corpus_files(corpus_dir).items():
+        build_segment(index_dir, book, book, iter_verses(path))
+        names.append(book)
+    write_segment_names(index_dir, names)
+    return names
+
+
+class IndexSegment:
+    """Segment de l'index ouvert en lecture (mmap)"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"Index {directory} construit pour une autre architecture")
+        self.name = os.path.basename(directory)
+        self.book = meta['livre']
+        self.size = meta['documents']
+        self.terms = meta['termes']
+        self.docs = map_array(os.path.join(directory, DOCS_FILE), np.uint32)
+        self.positions = map_array(os.path.join(directory, POSITIONS_FILE), np.uint16)
+        self.verses = artifact_verses(directory, meta.get('magasin'))
+        if self.verses.size != self.size:
+            raise ValueError(f"Index {directory} désynchronisé de son magasin des versets")
+
+    def postings(self, term):
+        """Documents et positions d'un terme"""
+        start, count = self.terms.get(term, (0, 0))
+        return self.docs[start:start + count], self.positions[start:start + count]
+
+    def occurrences(self, tokens):
+        """Documents et positions de début (triés) de la suite de mots : un mot seul ou une expression"""
+        if len(tokens) == 1:
+            return self.postings(tokens[0])
+        # Clé document << 16 | position de début de l'expression ; les postings
+        # étant triés par (document, position), les clés le sont aussi
+        candidates = None
+        for offset, token in enumerate(tokens):
+            docs, positions = self.postings(token)
+            keep = positions >= offset
+            keys = (docs[keep].astype(np.int64) << 16) | (positions[keep] - offset)
+            candidates = keys if candidates is None else np.intersect1d(candidates, keys, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return candidates >> 16, candidates & 0xFFFF
+
+    def match(self, tokens):
+        """Documents (triés) contenant la suite de mots"""
+        return _unique_sorted(self.occurrences(tokens)[0])
+
+    def reference(self, doc):
+        """(livre, chapitre, verset) d'un document"""
+        return self.verses.reference(doc)
+
+    def verse_text(self, doc):
+        """Texte d'un document"""
+        return self.verses.verse_text(doc)
+
+    def context(self, doc, position, length=1, words=CONTEXT_WORDS):
+        """Occurrence en contexte : `words` mots de part et d'autre, dans la graphie du texte"""
+        text = self.verse_text(doc)
+        spans = token_spans(text)
+        livre, chapitre, verset = self.reference(doc)
+        first, last = position, min(position + length, len(spans)) - 1
+        before, after = max(first - words, 0), min(last + words, len(spans) - 1)
+        return {
+            'Traduction': self.name,
+            'Référence': f"{livre} {chapitre}:{verset}",
+            'Avant': ("… " if before > 0 else "") + text[spans[before][0]:spans[first][0]].strip(),
+            'Mot': text[spans[first][0]:spans[last][1]],
+            'Après': text[spans[last][1]:spans[after][1]].strip() + (" …" if after < len(spans) - 1 else "")
+        }
+
+
+def parse_query(query):
+    """Découpe une requête en clauses : mots et "expressions exactes" (toutes requises)"""
+    clauses = []
+    for phrase, word in QUERY_RE.findall(query):
+        tokens = tokenize(phrase or word)
+        if tokens:
+            clauses.append(tokens)
+    return clauses
+
+
+class SearchIndex:
+    """Recherche plein texte sur l'ensemble des segments de l'index"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self.segments = [IndexSegment(os.path.join(index_dir, name))
+                         for name in read_segment_names(index_dir)]
+
+    @property
+    def books(self):
+        return sorted({segment.book for segment in self.segments})
+
+    def search(self, query, books=None, limit=50):
+        """Versets correspondant à toutes les clauses de la requête, filtrés par livre"""
+        clauses = parse_query(query)
+        hits = []
+        total = 0
+        if not clauses:
+            return total, hits
+
+        for segment in self.segments:
+            if books is not None and segment.book not in books:
+                continue
+            # Clause la plus rare en premier pour réduire les intersections
+            ordered = sorted(clauses, key=lambda tokens: segment.terms.get(tokens[0], (0, 0))[1])
+            docs = None
+            for tokens in ordered:
+                matched = segment.match(tokens)
+                docs = matched if docs is None else np.intersect1d(docs, matched, assume_unique=True)
+                if len(docs) == 0:
+                    break
+            if len(docs) == 0:
+                continue
+            total += len(docs)
+            for doc in docs[:max(0, limit - len(hits))].tolist():
+                livre, chapitre, verset = segment.reference(doc)
+                hits.append({
+                    'Livre': segment.book,
+                    'Traduction': segment.name,
+                    'Référence': f"{livre} {chapitre}:{verset}",
+                    'Texte': segment.verse_text(doc)
+                })
+        return total, hits
+
+    def concordance(self, query, books=None, limit=None, batch_size=CONCORDANCE_BATCH):
+        """Occurrences d'un mot ou d'une expression, diffusées par lots : (livre, nombre, lignes)
+
+        Les occurrences au-delà des `limit` premières d'un segment sont comptées sans être mises
+        en contexte (lot sans lignes).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return
+        for segment in self.segments:
+            if books is not None and segment.book not in books:
+                continue
+            docs, positions = segment.occurrences(tokens)
+            shown = len(docs) if limit is None else min(limit, len(docs))
+            for start in range(0, shown, batch_size):
+                end = min(start + batch_size, shown)
+                yield segment.book, end - start, [
+                    segment.context(doc, position, len(tokens))
+                    for doc, position in zip(docs[start:end].tolist(), positions[start:end].tolist())
+                ]
+            if len(docs) > shown:
+                yield segment.book, len(docs) - shown, []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index plein texte des livres sacrés")
+    parser.add_argument('--index', default=INDEX_DIR, help="Répertoire de l'index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Indexe tout le corpus")
+    build.add_argument('--corpus', default=CORPUS_DIR)
+
+    add = commands.add_parser('add', help="Ajoute une traduction sans reconstruire l'index")
+    add.add_argument('name', help="Nom du segment (ex. Bible-Segond)")
+    add.add_argument('book', help="Livre (Coran, Torah, Bible...)")
+    add.add_argument('path', help="Fichier de versets")
+
+    search = commands.add_parser('search', help="Interroge l'index")
+    search.add_argument('query')
+    search.add_argument('--livre', action='append')
+
+    kwic = commands.add_parser('concordance', help="Occurrences d'un mot ou d'une expression en contexte")
+    kwic.add_argument('query')
+    kwic.add_argument('--livre', action='append')
+    kwic.add_argument('--limite', type=int, default=50, help="Occurrences mises en contexte par segment")
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        print("Segments :", ", ".join(build_index(args.corpus, args.index)))
+    elif args.command == 'add':
+        add_translation(args.index, args.name, args.book, args.path)
+    elif args.command == 'concordance':
+        counts = defaultdict(int)
+        for book, count, rows in SearchIndex(args.index).concordance(args.query, args.livre, args.limite):
+            counts[book] += count
+            for row in rows:
+                print(f"[{row['Traduction']}] {row['Référence']:>16}  {row['Avant']:>50} [{row['Mot']}] {row['Après']}")
+        print(", ".join(f"{book} : {count}" for book, count in counts.items()) or "0 occurrence")
+    else:
+        index = SearchIndex(args.index)
+        start = time.perf_counter()
+        total, hits = index.search(args.query, args.livre)
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"[{hit['Traduction']}] {hit['Référence']} : {hit['Texte']}")
+        print(f"{total} verset(s) en {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
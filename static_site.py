@@ -0,0 +1,283 @@
+# static_site.py
+"""Export statique du dashboard : pages HTML pré-rendues, servies par un simple serveur de fichiers
+
+    python static_site.py build                       # publie data/site (lien vers la dernière version)
+    python static_site.py build --output /var/www/sacrement --workers 4 --app-url https://...
+
+L'en-tête, les cartes des livres et les sections Structure, Histoire, Influence et Thématiques
+sont rendus pour tous les livres. Les figures sont construites en parallèle (cache disque des
+figures partagé avec le dashboard) et toutes les pages chargent le même fichier plotly.js.
+La recherche et les passages parallèles restent dans le dashboard Streamlit (`--app-url`).
+"""
+import argparse
+import html
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from corpus import STATS_WORKERS
+
+SITE_DIR = os.environ.get(
+    "SACREMENT_SITE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "site")
+)
+ASSETS_DIR = "assets"
+# Versions publiées conservées à côté du lien (la courante et la précédente, pour les requêtes en vol)
+KEEP_RELEASES = 2
+
+# Page -> (fichier, titre de l'onglet) ; l'ordre est celui de la navigation
+PAGES = {
+    'accueil': ("index.html", "📖 Livres"),
+    'structure': ("structure.html", "📊 Structure"),
+    'histoire': ("histoire.html", "🕰️ Histoire"),
+    'influence': ("influence.html", "🌍 Influence"),
+    'thematiques': ("thematiques.html", "🎭 Thématiques")
+}
+
+# Mise en page propre au site (ajoutée au CSS du dashboard)
+SITE_CSS = """
+body { font-family: sans-serif; margin: 0 auto; max-width: 1400px; padding: 0 1.5rem 2rem; color: #262730; }
+nav { display: flex; gap: 1.5rem; padding: 1rem 0; border-bottom: 1px solid #ddd; }
+nav a { color: #262730; text-decoration: none; }
+nav a.active { color: #2E86AB; font-weight: bold; }
+.subtitle { text-align: center; color: #666; margin-bottom: 2rem; }
+.metrics { display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; }
+.metric-label { font-size: 0.9rem; color: #666; }
+.metric-value { font-size: 2rem; }
+.grid { display: grid; gap: 1rem; }
+table.details { border-collapse: collapse; width: 100%; }
+table.details th, table.details td { border: 1px solid #ddd; padding: 0.4rem; text-align: left; }
+footer { margin-top: 3rem; border-top: 1px solid #ddd; padding-top: 1rem; color: #666; }
+"""
+
+_figure_cache = None
+
+
+def _init_worker(cache_dir):
+    global _figure_cache
+    from figure_cache import FigureCache
+    _figure_cache = FigureCache(cache_dir)
+
+
+def render_figure(spec):
+    """Fragment HTML d'une figure (sans plotly.js) : spec = (identifiant, constructeur, données, paramètres)"""
+    import plotly.io as pio
+    div_id, builder, data, params = spec
+    fig = _figure_cache.get_or_build(builder, data, **params)
+    return div_id, pio.to_html(fig, full_html=False, include_plotlyjs=False, div_id=div_id,
+                               config={'responsive': True, 'displaylogo': False})
+
+
+def figure_specs(dashboard, view):
+    """Figures de chaque page, avec les mêmes constructeurs et paramètres que le dashboard"""
+    import pandas as pd
+    from charts import (build_bar_chart, build_bubble_chart, build_diffusion_chart, build_impact_chart,
+                        build_radar_chart, build_theme_heatmap)
+    from Sacrement import DIFFUSION_DATA, IMPACT_DATA
+    from timeline import build_timeline_chart
+
+    comparison_data = view.comparison_data
+    sizes = view.normalized('max')['Durée révélation (années)'].to_numpy()
+    specs = {
+        'structure': [
+            ('versets', build_bar_chart, comparison_data,
+             dict(y='Nombre de versets', title="Nombre de Versets par Livre")),
+            ('mots', build_bar_chart, comparison_data,
+             dict(y='Nombre de mots', title="Nombre de Mots par Livre")),
+            ('radar', build_radar_chart, view.normalized('max'), dict(colors=view.colors, method='max')),
+            ('bulles', build_bubble_chart, comparison_data.assign(Taille=sizes), dict(colors=view.colors))
+        ],
+        'histoire': [],
+        'influence': [
+            ('diffusion', build_diffusion_chart, view.book_columns(pd.DataFrame(DIFFUSION_DATA), 'Pays'), {}),
+            ('impact', build_impact_chart, view.book_columns(pd.DataFrame(IMPACT_DATA), 'Domaine'), {})
+        ],
+        'thematiques': [
+            ('themes', build_theme_heatmap, view.thematic_data['scores'], {})
+        ]
+    }
+
+    # Frise sur toute la période, comme à l'ouverture de la section
+    timeline_df = view.timeline(dashboard.load_timeline_data())
+    if not timeline_df.empty:
+        year_range = (int(timeline_df['Année'].min()), int(timeline_df['Année'].max()))
+        specs['histoire'].append(('frise', build_timeline_chart, timeline_df,
+                                  dict(colors=view.colors, year_range=year_range)))
+    return specs
+
+
+def render_figures(specs, workers=STATS_WORKERS, cache_dir=None):
+    """Fragments HTML de toutes les figures {identifiant: html}, construits en parallèle"""
+    from figure_cache import FIGURE_CACHE_DIR
+    cache_dir = cache_dir or FIGURE_CACHE_DIR
+    flat = [spec for page_specs in specs.values() for spec in page_specs]
+    if workers <= 1 or len(flat) <= 1:
+        _init_worker(cache_dir)
+        return dict(map(render_figure, flat))
+    with ProcessPoolExecutor(max_workers=min(workers, len(flat)), initializer=_init_worker,
+                             initargs=(cache_dir,)) as executor:
+        return dict(executor.map(render_figure, flat))
+
+
+def _grid(cells, columns=2):
+    return (f"<div class='grid' style='grid-template-columns: repeat({columns}, 1fr);'>"
+            + "".join(f"<div>{cell}</div>" for cell in cells) + "</div>")
+
+
+def _section_header(title):
+    return f"<h3 class='section-header'>{html.escape(title)}</h3>"
+
+
+def page_bodies(dashboard, view, figures):
+    """Contenu HTML de chaque page"""
+    metrics = "".join(
+        f"<div class='metric'><div class='metric-label'>{html.escape(label)}</div>"
+        f"<div class='metric-value'>{html.escape(str(value))}</div></div>"
+        for label, value in dashboard.header_metrics(view)
+    )
+    cards = [dashboard.book_card_html(html.escape(book), {field: html.escape(str(value))
+                                                          for field, value in data.items()})
+             for book, data in view.books_data.items()]
+    bodies = {
+        'accueil': (f"<div class='metrics'>{metrics}</div>"
+                    + _section_header("📖 Présentation des Livres Sacrés") + _grid(cards, 3)),
+        'structure': (_section_header("📊 Analyse Structurelle")
+                      + _grid([figures['versets'], figures['mots']])
+                      + _grid([figures['radar'], figures['bulles']])
+                      + "<h4>Tableau Comparatif Détaillé</h4>"
+                      + dashboard.structure_details(view).to_html(index=False, classes='details', border=0)),
+        'histoire': (_section_header("🕰️ Frise Chronologique")
+                     + figures.get('frise', "<p>Aucun événement pour les livres sélectionnés.</p>")),
+        'influence': (_section_header("🌍 Influence et Diffusion")
+                      + _grid([figures['diffusion'], figures['impact']]))
+    }
+
+    themes = []
+    for book, book_themes in view.thematic_data['themes_cles'].items():
+        icon = dashboard.BOOK_ICONS.get(book, '📖')
+        items = "".join(f"<li><strong>{html.escape(str(theme))}</strong></li>" for theme in book_themes)
+        themes.append(f"<h4>{icon} {html.escape(book)} - Thèmes Clés</h4><ul>{items}</ul>")
+    bodies['thematiques'] = (_section_header("🎭 Analyse Thématique") + figures['themes']
+                             + _grid(themes, max(len(themes), 1)))
+    return bodies
+
+
+def page_html(page, body, plotly_js, generated, app_url=None):
+    """Page complète : navigation, en-tête, contenu et pied de page"""
+    links = [f"<a href='{file}'{' class=active' if name == page else ''}>{label}</a>"
+             for name, (file, label) in PAGES.items()]
+    if app_url:
+        links.append(f"<a href='{html.escape(app_url)}'>🔎 Recherche et analyse interactive</a>")
+    return f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Dashboard Comparatif - Livres Sacrés</title>
+<link rel="stylesheet" href="{ASSETS_DIR}/style.css">
+<script src="{ASSETS_DIR}/{plotly_js}"></script>
+</head>
+<body>
+<nav>{''.join(links)}</nav>
+<h1 class="main-header">📚 Dashboard Comparatif - Livres Sacrés</h1>
+<div class="subtitle">Analyse comparative du Coran, de la Torah et de la Bible : structure, histoire et influence</div>
+{body}
+<footer>
+<strong>Sources:</strong> Données religieuses et historiques consolidées<br>
+<strong>Objectif:</strong> Analyse comparative objective des textes sacrés<br>
+<em>Données à but éducatif et informatif</em> — page générée le {generated}
+</footer>
+</body>
+</html>
+"""
+
+
+def publish(release, output):
+    """Fait pointer le lien `output` sur `release` (os.replace atomique), puis supprime les vieilles versions"""
+    if os.path.isdir(output) and not os.path.islink(output):
+        # Ancien export en répertoire simple : remplacé une fois, sans garantie d'atomicité
+        shutil.rmtree(f"{output}.old", ignore_errors=True)
+        os.replace(output, f"{output}.old")
+        shutil.rmtree(f"{output}.old", ignore_errors=True)
+    link = f"{output}.lien.tmp"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(release), link)
+    os.replace(link, output)
+
+    parent, prefix = os.path.dirname(output), os.path.basename(output) + "."
+    releases = sorted(name for name in os.listdir(parent)
+                      if name.startswith(prefix) and name != os.path.basename(link)
+                      and os.path.isdir(os.path.join(parent, name)) and name[len(prefix):][:1].isdigit())
+    for name in releases[:-KEEP_RELEASES]:
+        if os.path.join(parent, name) != release:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def export_site(output=SITE_DIR, workers=STATS_WORKERS, app_url=None, dashboard=None):
+    """Écrit le site statique et le publie sous `output` (lien symbolique) ; retourne la durée de chaque étape (s)"""
+    import plotly
+    from plotly.offline import get_plotlyjs
+    from profiling import Profiler
+    from Sacrement import PAGE_CSS, SacredBooksDashboard
+
+    timings = {}
+    start = time.perf_counter()
+    if dashboard is None:
+        dashboard = SacredBooksDashboard(profiler=Profiler(enabled=False))
+    view = dashboard.filtered_view()
+    specs = figure_specs(dashboard, view)
+    timings['donnees'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    figures = render_figures(specs, workers)
+    timings['figures'] = time.perf_counter() - start
+
+    # Le site est écrit dans une nouvelle version puis publié en repointant le lien `output` :
+    # le serveur de fichiers voit l'ancienne ou la nouvelle version, jamais un site partiel ni absent
+    start = time.perf_counter()
+    output = os.path.abspath(output.rstrip(os.sep))
+    release = f"{output}.{time.time_ns()}"
+    os.makedirs(os.path.join(release, ASSETS_DIR))
+
+    # plotly.js versionné : mis en cache une fois par le navigateur pour toutes les pages
+    plotly_js = f"plotly-{plotly.__version__}.min.js"
+    with open(os.path.join(release, ASSETS_DIR, plotly_js), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    with open(os.path.join(release, ASSETS_DIR, "style.css"), 'w', encoding='utf-8') as f:
+        f.write(PAGE_CSS + SITE_CSS)
+
+    generated = time.strftime("%Y-%m-%d %H:%M")
+    for page, body in page_bodies(dashboard, view, figures).items():
+        with open(os.path.join(release, PAGES[page][0]), 'w', encoding='utf-8') as f:
+            f.write(page_html(page, body, plotly_js, generated, app_url))
+
+    publish(release, output)
+    timings['ecriture'] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export statique du dashboard")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Génère les pages HTML")
+    build.add_argument('--output', default=SITE_DIR)
+    build.add_argument('--workers', type=int, default=STATS_WORKERS)
+    build.add_argument('--app-url', help="Lien vers le dashboard Streamlit (recherche, parallèles)")
+    args = parser.parse_args(argv)
+
+    # Hors `streamlit run`, chaque appel st.* signale l'absence de contexte d'exécution
+    import streamlit as st
+    from streamlit.logger import set_log_level
+    st.config.set_option('logger.level', 'error')
+    set_log_level('error')
+
+    timings = export_site(args.output, args.workers, args.app_url)
+    for step, seconds in timings.items():
+        print(f"{step:<10} {seconds * 1000:8.1f} ms")
+    print(f"site : {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# timeline.py
+"""Frise chronologique à grande échelle : rendu WebGL, annotations groupées, regroupement par niveau de détail"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Fichier d'événements (CSV, JSON ou JSON lines) : Événement, Année, Livre, Description[, Importance]
+TIMELINE_FILE = os.environ.get(
+    "SACREMENT_TIMELINE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "timeline.csv")
+)
+TIMELINE_COLUMNS = ['Événement', 'Année', 'Livre', 'Description']
+
+# Au-delà de MAX_POINTS événements visibles, les événements sont regroupés par intervalle d'années
+MAX_POINTS = 2000
+MAX_LABELS = 25
+
+
+def load_timeline_events(path=TIMELINE_FILE):
+    """Charge les événements d'un fichier externe"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        df = pd.read_csv(path)
+    elif ext == '.jsonl':
+        df = pd.read_json(path, lines=True)
+    elif ext == '.json':
+        df = pd.read_json(path)
+    else:
+        raise ValueError(f"Format de frise non supporté : {path}")
+
+    missing = [column for column in TIMELINE_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} : colonnes manquantes {missing}")
+    df['Année'] = df['Année'].astype(int)
+    return df.sort_values('Année', kind='stable').reset_index(drop=True)
+
+
+def cluster_events(df, year_range, max_points=MAX_POINTS):
+    """Regroupe les événements par livre et intervalle d'années (niveau de détail réduit)"""
+    books = max(df['Livre'].nunique(), 1)
+    bins = max(max_points // books, 1)
+    low, high = year_range
+    width = max((high - low + 1) / bins, 1)
+    bucket = np.minimum(((df['Année'].to_numpy() - low) / width).astype(np.int64), bins - 1)
+
+    grouped = df.assign(_bucket=bucket).groupby(['Livre', '_bucket'], sort=False)
+    clusters = grouped.agg(
+        Année=('Année', 'mean'),
+        Début=('Année', 'min'),
+        Fin=('Année', 'max'),
+        Nombre=('Année', 'size'),
+        Événement=('Événement', 'first')
+    ).reset_index()
+    return clusters.drop(columns='_bucket')
+
+
+def _labels(df, max_labels, weight_column):
+    """Annotations de la frise, construites en une seule liste"""
+    if len(df) > max_labels:
+        if weight_column in df.columns:
+            df = df.nlargest(max_labels, weight_column)
+        else:
+            df = df.iloc[np.linspace(0, len(df) - 1, max_labels).astype(int)]
+    return [dict(x=year, y=book, text=text, showarrow=True, arrowhead=1, ax=0, ay=-40)
+            for year, book, text in zip(df['Année'], df['Livre'], df['Événement'])]
+
+
+def build_timeline_chart(timeline_df, colors=None, year_range=None,
+                         max_points=MAX_POINTS, max_labels=MAX_LABELS):
+    """Frise chronologique : points WebGL, ou groupes d'événements si la période en compte trop"""
+    colors = colors or {}
+    if year_range is None and len(timeline_df):
+        year_range = (int(timeline_df['Année'].min()), int(timeline_df['Année'].max()))
+    if year_range is not None:
+        years = timeline_df['Année']
+        timeline_df = timeline_df[(years >= year_range[0]) & (years <= year_range[1])]
+
+    clustered = len(timeline_df) > max_points
+    fig = go.Figure()
+
+    if clustered:
+        points = cluster_events(timeline_df, year_range, max_points)
+        for book, group in points.groupby('Livre', sort=False):
+            fig.add_trace(go.Scattergl(
+                x=group['Année'], y=group['Livre'], mode='markers', name=book,
+                marker=dict(color=colors.get(book), size=np.clip(6 + 3 * np.log2(group['Nombre']), 6, 30)),
+                customdata=np.column_stack([group['Nombre'], group['Début'], group['Fin'], group['Événement']]),
+                hovertemplate="%{customdata[0]} événements (%{customdata[1]} à %{customdata[2]})"
+                              "<br>ex. %{customdata[3]}<extra></extra>"
+            ))
+        annotations = _labels(points, max_labels, 'Nombre')
+    else:
+        points = timeline_df
+        for book, group in points.groupby('Livre', sort=False):
+            fig.add_trace(go.Scattergl(
+                x=group['Année'], y=group['Livre'], mode='markers', name=book,
+                marker=dict(color=colors.get(book), size=10),
+                customdata=np.column_stack([group['Événement'], group['Description']]),
+                hovertemplate="<b>%{customdata[0]}</b> (%{x})<br>%{customdata[1]}<extra></extra>"
+            ))
+        annotations = _labels(points, max_labels, 'Importance')
+
+    title = "Frise Chronologique des Livres Sacrés"
+    if clustered:
+        title += f" ({len(timeline_df):,} événements regroupés)"
+    fig.update_layout(title=title, height=400, showlegend=False, annotations=annotations,
+                      xaxis_title='Année', yaxis_title='Livre')
+    return fig
@@ -0,0 +1,329 @@
+# verse_store.py
+"""Magasin compact des versets : un tampon UTF-8 contigu et des tables d'offsets mappés en mémoire
+
+    python verse_store.py lire Bible Genèse 1 1 --versets data/derived/versets
+    python verse_store.py chapitre Coran Coran 112
+    python verse_store.py memoire
+
+Un verset coûte 8 octets d'offset et 6 octets de référence en plus de son texte, au lieu d'une
+chaîne Python et d'une entrée de dictionnaire. Les tables denses (division, chapitre, verset)
+donnent le numéro d'un verset en O(1) ; les versets d'un chapitre sont lus d'un seul bloc.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import weakref
+from array import array
+
+import numpy as np
+
+# Fichiers d'un livre ; les tableaux sont en little-endian quelle que soit la machine
+TEXT_FILE = "textes.bin"
+OFFSETS_FILE = "textes_offsets.bin"
+REFERENCES_FILE = "references.bin"
+CHAPTERS_FILE = "table_chapitres.bin"
+VERSES_FILE = "table_versets.bin"
+DOCS_FILE = "table_documents.bin"
+META_FILE = "versets.json"
+
+OFFSET_DTYPE = np.dtype('<u8')
+REFERENCE_DTYPE = np.dtype('<u2')
+BASE_DTYPE = np.dtype('<i8')
+DOC_DTYPE = np.dtype('<i4')
+
+# Entrée des tables denses sans verset
+MISSING = -1
+
+
+def map_array(path, dtype):
+    """Vue zéro-copie d'un fichier binaire comme tableau typé"""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+def lookup_tables(references):
+    """Tables denses (bases des chapitres, bases des versets, documents) d'un tableau de références
+
+    Les chapitres de la division d occupent les cases chapitres[d] + c, c de 0 au plus grand
+    chapitre ; les versets de la case s occupent versets[s] + v dans la table des documents.
+    """
+    references = np.asarray(references, dtype=np.int64).reshape(-1, 3)
+    divisions, chapters, verses = references.T
+    count = int(divisions.max()) + 1 if len(references) else 0
+
+    # Nombre de cases de chapitre par division, de versets par case de chapitre
+    chapter_counts = np.zeros(count, dtype=np.int64)
+    np.maximum.at(chapter_counts, divisions, chapters + 1)
+    chapter_base = np.concatenate([[0], np.cumsum(chapter_counts)])
+    slots = chapter_base[divisions] + chapters
+    verse_counts = np.zeros(chapter_base[-1], dtype=np.int64)
+    np.maximum.at(verse_counts, slots, verses + 1)
+    verse_base = np.concatenate([[0], np.cumsum(verse_counts)])
+
+    # En cas de référence dupliquée, le premier verset l'emporte
+    docs = np.full(verse_base[-1], MISSING, dtype=np.int64)
+    positions, first = np.unique(verse_base[slots] + verses, return_index=True)
+    docs[positions] = first
+    return chapter_base, verse_base, docs
+
+
+class VerseWriter:
+    """Écrit les versets d'un livre dans `directory`, en flux ; close() écrit les tables"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.divisions = {}
+        self.references = array('H')
+        self.offsets = array('Q', [0])
+        self._text = open(os.path.join(directory, TEXT_FILE), 'wb')
+
+    def add(self, verse):
+        """Ajoute un verset ; retourne son numéro dans le livre"""
+        division = self.divisions.setdefault(verse.livre, len(self.divisions))
+        self.references.extend((division, verse.chapitre, verse.verset))
+        encoded = verse.texte.encode('utf-8')
+        self._text.write(encoded)
+        self.offsets.append(self.offsets[-1] + len(encoded))
+        return len(self.offsets) - 2
+
+    def close(self):
+        """Écrit offsets, références et tables de recherche ; retourne le nombre de versets"""
+        self._text.close()
+        references = np.frombuffer(self.references, dtype=np.uint16)
+        chapter_base, verse_base, docs = lookup_tables(references)
+        arrays = {
+            OFFSETS_FILE: np.frombuffer(self.offsets, dtype=np.uint64).astype(OFFSET_DTYPE),
+            REFERENCES_FILE: references.astype(REFERENCE_DTYPE),
+            CHAPTERS_FILE: chapter_base.astype(BASE_DTYPE),
+            VERSES_FILE: verse_base.astype(BASE_DTYPE),
+            DOCS_FILE: docs.astype(DOC_DTYPE)
+        }
+        for name, values in arrays.items():
+            values.tofile(os.path.join(self.directory, name))
+        with open(os.path.join(self.directory, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'versets': len(self.offsets) - 1, 'divisions': list(self.divisions)}, f, ensure_ascii=False)
+        return len(self.offsets) - 1
+
+
+def build_store(verses_dir, book, verses):
+    """Magasin des versets d'un livre (remplacement atomique)"""
+    target = os.path.join(verses_dir, book)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    writer = VerseWriter(tmp)
+    for verse in verses:
+        writer.add(verse)
+    writer.close()
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+
+class BookVerses:
+    """Versets d'un livre ouverts en lecture (mmap) : accès par numéro ou par référence"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.size = meta['versets']
+        self.divisions = meta['divisions']
+        self._division_ids = {name: i for i, name in enumerate(self.divisions)}
+        self.text = map_array(os.path.join(directory, TEXT_FILE), np.uint8)
+        self.offsets = map_array(os.path.join(directory, OFFSETS_FILE), OFFSET_DTYPE)
+        self.references = map_array(os.path.join(directory, REFERENCES_FILE), REFERENCE_DTYPE)
+        self.chapter_base = map_array(os.path.join(directory, CHAPTERS_FILE), BASE_DTYPE)
+        self.verse_base = map_array(os.path.join(directory, VERSES_FILE), BASE_DTYPE)
+        self.docs = map_array(os.path.join(directory, DOCS_FILE), DOC_DTYPE)
+
+    def reference(self, doc):
+        """(livre, chapitre, verset) d'un verset"""
+        division, chapter, verse = (int(v) for v in self.references[3 * doc:3 * doc + 3])
+        return self.divisions[division], chapter, verse
+
+    def verse_text(self, doc):
+        """Texte d'un verset"""
+        return self.text[int(self.offsets[doc]):int(self.offsets[doc + 1])].tobytes().decode('utf-8')
+
+    def _slot(self, livre, chapitre):
+        """Case du chapitre dans la table des versets (None s'il n'existe pas)"""
+        division = self._division_ids.get(livre)
+        if division is None or chapitre < 0:
+            return None
+        slot = int(self.chapter_base[division]) + chapitre
+        return slot if slot < self.chapter_base[division + 1] else None
+
+    def find(self, livre, chapitre, verset):
+        """Numéro du verset (livre, chapitre, verset), ou None"""
+        slot = self._slot(livre, chapitre)
+        if slot is None or verset < 0:
+            return None
+        position = int(self.verse_base[slot]) + verset
+        if position >= self.verse_base[slot + 1]:
+            return None
+        doc = int(self.docs[position])
+        return None if doc == MISSING else doc
+
+    def lookup(self, livre, chapitre, verset):
+        """Texte du verset (livre, chapitre, verset) ; KeyError s'il n'existe pas"""
+        doc = self.find(livre, chapitre, verset)
+        if doc is None:
+            raise KeyError(f"{livre} {chapitre}:{verset}")
+        return self.verse_text(doc)
+
+    def chapters(self, livre):
+        """Numéros des chapitres d'une division"""
+        division = self._division_ids.get(livre)
+        if division is None:
+            return []
+        start, end = int(self.chapter_base[division]), int(self.chapter_base[division + 1])
+        return (np.flatnonzero(np.diff(self.verse_base[start:end + 1]) > 0)).tolist()
+
+    def chapter(self, livre, chapitre):
+        """Versets d'un chapitre [(verset, texte)], décodés depuis un seul bloc du tampon"""
+        slot = self._slot(livre, chapitre)
+        if slot is None:
+            return []
+        docs = np.asarray(self.docs[int(self.verse_base[slot]):int(self.verse_base[slot + 1])])
+        numbers = np.flatnonzero(docs != MISSING)
+        docs = docs[numbers]
+        if len(docs) == 0:
+            return []
+        start = int(self.offsets[docs.min()])
+        block = self.text[start:int(self.offsets[docs.max() + 1])].tobytes()
+        begins = self.offsets[docs].astype(np.int64) - start
+        ends = self.offsets[docs + 1].astype(np.int64) - start
+        return [(verse, block[begin:end].decode('utf-8'))
+                for verse, begin, end in zip(numbers.tolist(), begins.tolist(), ends.tolist())]
+
+    def char_lengths(self):
+        """Longueur de chaque verset en caractères (octets hors octets de continuation UTF-8)"""
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        continuation = np.concatenate([[0], np.cumsum((np.asarray(self.text) & 0xC0) == 0x80, dtype=np.int64)])
+        return np.diff(offsets) - np.diff(continuation[offsets])
+
+    def first(self):
+        """Texte du premier verset du livre"""
+        return self.verse_text(0) if self.size else ''
+
+    def last(self):
+        """Texte du dernier verset du livre"""
+        return self.verse_text(self.size - 1) if self.size else ''
+
+    def memory_usage(self):
+        """Octets occupés par le tampon de texte et par les tables"""
+        tables = (self.offsets, self.references, self.chapter_base, self.verse_base, self.docs)
+        return {'texte': int(self.text.nbytes), 'tables': int(sum(table.nbytes for table in tables))}
+
+
+def dict_of_strings_size(book):
+    """Estimation de la mémoire d'un dictionnaire {(livre, chapitre, verset): texte} équivalent"""
+    if book.size == 0:
+        return 0
+    size = sys.getsizeof(dict.fromkeys(range(book.size)))
+    for doc in range(book.size):
+        size += sys.getsizeof(book.verse_text(doc)) + sys.getsizeof(book.reference(doc))
+    return size
+
+
+_open_lock = threading.Lock()
+_open_books = weakref.WeakValueDictionary()
+
+
+def open_book(directory):
+    """Magasin d'un livre, ouvert une seule fois par processus tant qu'il est utilisé
+
+    Le magasin des versets, l'index et les signatures d'un livre partagent ainsi le même
+    mappage ; un magasin reconstruit (métadonnées plus récentes) est rouvert.
+    """
+    meta = os.stat(os.path.join(directory, META_FILE))
+    key = (os.path.realpath(directory), meta.st_mtime_ns, meta.st_ino)
+    with _open_lock:
+        book = _open_books.get(key)
+        if book is None:
+            book = _open_books[key] = BookVerses(directory)
+        return book
+
+
+def shared_path(directory, verses_dir):
+    """Chemin du magasin `verses_dir` relatif au répertoire d'un artefact (index, signatures)"""
+    return os.path.relpath(verses_dir, directory)
+
+
+def artifact_verses(directory, shared=None):
+    """Versets d'un artefact : le magasin partagé `shared` (voir shared_path) ou sa copie embarquée"""
+    return open_book(os.path.normpath(os.path.join(directory, shared)) if shared else directory)
+
+
+class VerseStore:
+    """Magasins des livres d'un répertoire (un sous-répertoire par livre)"""
+
+    def __init__(self, verses_dir, books=None):
+        self.verses_dir = verses_dir
+        if books is None:
+            books = sorted(name for name in os.listdir(verses_dir)
+                           if os.path.exists(os.path.join(verses_dir, name, META_FILE)))
+        self.books = {book: open_book(os.path.join(verses_dir, book)) for book in books}
+
+    def __contains__(self, book):
+        return book in self.books
+
+    def __getitem__(self, book):
+        return self.books[book]
+
+    def lookup(self, book, livre, chapitre, verset):
+        """Texte d'un verset ; KeyError si le livre ou la référence n'existe pas"""
+        return self.books[book].lookup(livre, chapitre, verset)
+
+    def memory_report(self, compare=False):
+        """Mémoire par livre (octets) ; `compare` estime aussi un dictionnaire de chaînes équivalent"""
+        report = {}
+        for name, book in self.books.items():
+            usage = book.memory_usage()
+            entry = {'versets': book.size, 'texte': usage['texte'], 'tables': usage['tables'],
+                     'total': usage['texte'] + usage['tables']}
+            if compare:
+                entry['dictionnaire'] = dict_of_strings_size(book)
+            report[name] = entry
+        return report
+
+
+def main(argv=None):
+    from pipeline import DERIVED_DIR
+
+    parser = argparse.ArgumentParser(description="Magasin compact des versets")
+    parser.add_argument('--versets', default=os.path.join(DERIVED_DIR, 'versets'),
+                        help="Répertoire des magasins (un sous-répertoire par livre)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    read = commands.add_parser('lire', help="Affiche un verset")
+    read.add_argument('livre')
+    read.add_argument('division')
+    read.add_argument('chapitre', type=int)
+    read.add_argument('verset', type=int)
+    chapter = commands.add_parser('chapitre', help="Affiche un chapitre")
+    chapter.add_argument('livre')
+    chapter.add_argument('division')
+    chapter.add_argument('chapitre', type=int)
+    commands.add_parser('memoire', help="Mémoire du magasin comparée à un dictionnaire de chaînes")
+    args = parser.parse_args(argv)
+
+    store = VerseStore(args.versets)
+    if args.command == 'lire':
+        print(store.lookup(args.livre, args.division, args.chapitre, args.verset))
+    elif args.command == 'chapitre':
+        for verse, text in store[args.livre].chapter(args.division, args.chapitre):
+            print(f"{verse:>4} {text}")
+    else:
+        for book, entry in store.memory_report(compare=True).items():
+            ratio = entry['total'] / entry['dictionnaire'] if entry['dictionnaire'] else 0
+            print(f"{book:<12} {entry['versets']:>8} versets  magasin {entry['total'] / 1024:10.1f} Ko  "
+                  f"dictionnaire {entry['dictionnaire'] / 1024:10.1f} Ko  ({ratio:.0%})")
+
+
+if __name__ == "__main__":
+    main()
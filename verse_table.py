@@ -0,0 +1,102 @@
+# verse_table.py
+"""Table des versets paginée côté serveur : tris précalculés, filtres en tableaux, une page à la fois"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Tri affiché -> colonne triée (None : ordre du texte)
+SORT_KEYS = {
+    'Ordre du texte': None,
+    'Longueur': 'lengths',
+    'Mots': 'words',
+    'Texte (alphabétique)': 'texts'
+}
+PAGE_SIZES = [25, 50, 100, 200]
+
+# Sélections (tri, filtres) conservées : tourner les pages ne recalcule rien
+SELECTION_CACHE_ENTRIES = 16
+
+
+class VerseTable:
+    """Une ligne par verset du magasin ; seul le texte des lignes de la page affichée est décodé"""
+
+    def __init__(self, store, word_counts=None):
+        self.store = store
+        self.books = list(store.books)
+        sizes = [store[book].size for book in self.books]
+        self.starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self.book_ids = np.repeat(np.arange(len(self.books), dtype=np.int32), sizes)
+        self.lengths = (np.concatenate([store[book].char_lengths() for book in self.books])
+                        if self.books else np.empty(0, dtype=np.int64))
+        self.words = None
+        if word_counts is not None and all(book in word_counts for book in self.books):
+            self.words = (np.concatenate([word_counts[book] for book in self.books])
+                          if self.books else np.empty(0, dtype=np.int64))
+        self._orders = {}
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def _sort_values(self, column):
+        if column == 'texts':
+            return np.array([self.store[book].verse_text(doc).casefold()
+                             for book in self.books for doc in range(self.store[book].size)], dtype=object)
+        return getattr(self, column)
+
+    def order(self, column, descending=False):
+        """Permutation triant la table sur `column`, calculée une fois (ordre du texte à égalité)"""
+        if column is None:
+            return np.arange(len(self))
+        if (column, descending) not in self._orders:
+            values = self._sort_values(column)
+            if values.dtype == object:
+                # Rangs denses : un tri décroissant sur -rang garde l'ordre du texte à égalité
+                values = np.unique(values, return_inverse=True)[1]
+            self._orders[column, descending] = np.argsort(-values if descending else values, kind='stable')
+        return self._orders[column, descending]
+
+    def select(self, sort=None, descending=False, books=None, min_words=None, max_words=None):
+        """Lignes retenues par les filtres, dans l'ordre du tri"""
+        key = (sort, descending, None if books is None else frozenset(books), min_words, max_words)
+        with self._lock:
+            rows = self._selections.get(key)
+            if rows is None:
+                order = self.order(sort, descending)
+                mask = np.ones(len(self), dtype=bool)
+                if books is not None:
+                    mask &= np.isin(self.book_ids, [i for i, book in enumerate(self.books) if book in books])
+                if self.words is not None and min_words is not None:
+                    mask &= self.words >= min_words
+                if self.words is not None and max_words is not None:
+                    mask &= self.words <= max_words
+                rows = order[mask[order]]
+                self._selections[key] = rows
+            self._selections.move_to_end(key)
+            while len(self._selections) > SELECTION_CACHE_ENTRIES:
+                self._selections.popitem(last=False)
+            return rows
+
+    def page(self, rows, number, size):
+        """Lignes de la page `number` (à partir de 1) de la sélection `rows`"""
+        window = rows[(number - 1) * size:number * size]
+        records = []
+        for row in window.tolist():
+            book_id = int(self.book_ids[row])
+            verses = self.store[self.books[book_id]]
+            doc = row - int(self.starts[book_id])
+            livre, chapitre, verset = verses.reference(doc)
+            records.append({
+                'Livre': self.books[book_id],
+                'Référence': f"{livre} {chapitre}:{verset}",
+                'Longueur': int(self.lengths[row]),
+                'Mots': int(self.words[row]) if self.words is not None else None,
+                'Texte': verses.verse_text(doc)
+            })
+        columns = ['Livre', 'Référence', 'Longueur', 'Mots', 'Texte']
+        if self.words is None:
+            columns.remove('Mots')
+        return pd.DataFrame(records, columns=columns)